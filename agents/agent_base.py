@@ -1,12 +1,31 @@
 """Base agent class with WebSocket client connection."""
 
 import asyncio
-import json
 import logging
 from typing import Dict, Any, Optional, Callable, List
 
+import msgpack
+import orjson
 import websockets
 
+# Broadcasts arrive as msgpack when the server accepts this subprotocol
+MSGPACK_SUBPROTOCOL = "msgpack-v1"
+
+
+def _dumps(message: Dict[str, Any]) -> str:
+    """Serialize an outbound message; the server reads text frames."""
+    return orjson.dumps(message).decode()
+
+
+def apply_patch(snapshot: Dict[str, Any], patch: List[Dict[str, Any]]):
+    """Apply an orderbook_delta patch (top-level JSON Patch ops) in place."""
+    for op in patch:
+        key = op["path"][1:]
+        if op["op"] == "remove":
+            snapshot.pop(key, None)
+        else:
+            snapshot[key] = op["value"]
+
 
 class BaseAgent:
     """
@@ -61,11 +80,16 @@ class BaseAgent:
         for attempt in range(max_retries):
             try:
                 self.logger.info("Attempting connection (%d/%d)...", attempt + 1, max_retries)
-                self.ws = await websockets.connect(self.ws_url, ping_interval=20, ping_timeout=10)
+                self.ws = await websockets.connect(
+                    self.ws_url,
+                    subprotocols=[MSGPACK_SUBPROTOCOL],
+                    ping_interval=20,
+                    ping_timeout=10,
+                )
                 self.connected = True
                 
                 # Register as agent
-                await self.ws.send(json.dumps({
+                await self.ws.send(_dumps({
                     "type": "agent_register",
                     "agent_id": self.agent_id,
                     "name": self.name,
@@ -99,9 +123,14 @@ class BaseAgent:
         if not self.ws:
             return
         
+        # Binary frames are msgpack only if the server took the subprotocol; replies stay JSON text
+        use_msgpack = self.ws.subprotocol == MSGPACK_SUBPROTOCOL
         try:
             async for message in self.ws:
-                data = json.loads(message)
+                if use_msgpack and isinstance(message, bytes):
+                    data = msgpack.unpackb(message, strict_map_key=False)
+                else:
+                    data = orjson.loads(message)
                 await self.handle_message(data)
         except websockets.exceptions.ConnectionClosed:
             self.logger.warning("Connection closed by server")
@@ -123,6 +152,15 @@ class BaseAgent:
             if self.on_orderbook_update:
                 await self.on_orderbook_update(self.orderbooks)
         
+        elif msg_type == "orderbook_delta":
+            # Patch the books we hold; unknown symbols arrive in the next full snapshot
+            for entry in data.get("data", []):
+                snapshot = self.orderbooks.get(int(entry["symbol_id"]))
+                if snapshot is not None:
+                    apply_patch(snapshot, entry["patch"])
+            if self.on_orderbook_update:
+                await self.on_orderbook_update(self.orderbooks)
+        
         elif msg_type == "portfolio_update":
             # Update portfolio
             self.portfolio = data
@@ -160,7 +198,7 @@ class BaseAgent:
             "agent_id": self.agent_id
         }
         
-        await self.ws.send(json.dumps(message))
+        await self.ws.send(_dumps(message))
         return {"status": "sent"}
     
     async def cancel_order(self, symbol_id: int, order_id: int):
@@ -174,7 +212,7 @@ class BaseAgent:
             "orderId": order_id
         }
         
-        await self.ws.send(json.dumps(message))
+        await self.ws.send(_dumps(message))
         return {"status": "sent"}
     
     async def get_portfolio(self):
@@ -187,7 +225,7 @@ class BaseAgent:
             "agent_id": self.agent_id
         }
         
-        await self.ws.send(json.dumps(message))
+        await self.ws.send(_dumps(message))
     
     def get_orderbook(self, symbol_id: int) -> Optional[Dict[str, Any]]:
         """Get current orderbook for an instrument."""
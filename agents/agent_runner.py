@@ -1,12 +1,12 @@
 """Manages multiple agent instances with improved structure."""
 
 import asyncio
-import json
 import logging
 import random
 import uuid
 from typing import List, Dict, Any, Optional
 import httpx
+import orjson
 import websockets
 
 from langraph_agent import LangGraphAgent
@@ -50,7 +50,7 @@ class AgentRunner:
         self.api_url = self.ws_url.replace("ws://", "http://").replace("wss://", "https://").replace("/ws", "")
         self.http_client = httpx.AsyncClient(timeout=5.0)
         self.managed_agent_ids: set = set()  # Track which agent IDs we're managing
-        self.listener_ws = None  # WebSocket connection for listening to agent_created events
+        self.listener_ws = None  # WebSocket connection for listening to agents_delta events
         self.listener_task = None  # Task for the listener
     
     async def create_agents(self) -> List[LangGraphAgent]:
@@ -250,11 +250,11 @@ class AgentRunner:
             max_startup_delay
         )
         
-        # Start WebSocket listener for real-time agent_created events
+        # Start WebSocket listener for real-time agents_delta events
         self.listener_task = asyncio.create_task(self._listen_for_agent_events())
     
     async def _listen_for_agent_events(self):
-        """Listen for real-time agent_created events via WebSocket."""
+        """Listen for agents added in real time (agents_delta events) via WebSocket."""
         max_retries = 5
         retry_delay = 5.0
         
@@ -268,16 +268,16 @@ class AgentRunner:
                     while self.running:
                         try:
                             message = await asyncio.wait_for(ws.recv(), timeout=30.0)
-                            data = json.loads(message)
+                            data = orjson.loads(message)
                             
-                            if data.get("type") == "agent_created":
-                                agent_data = data.get("data", {})
-                                agent_id = agent_data.get("agent_id")
-                                
-                                if agent_id and agent_id not in self.managed_agent_ids:
-                                    logger.info("Received agent_created event for: %s (%s), spawning...", 
-                                              agent_data.get("name"), agent_id)
-                                    await self._spawn_agent_from_event(agent_data)
+                            if data.get("type") == "agents_delta":
+                                for agent_data in data.get("added", []):
+                                    agent_id = agent_data.get("agent_id")
+                                    
+                                    if agent_id and agent_id not in self.managed_agent_ids:
+                                        logger.info("Received new agent: %s (%s), spawning...", 
+                                                  agent_data.get("name"), agent_id)
+                                        await self._spawn_agent_from_event(agent_data)
                         except asyncio.TimeoutError:
                             # Timeout is fine, just continue listening
                             continue
@@ -298,7 +298,7 @@ class AgentRunner:
         self.listener_ws = None
     
     async def _spawn_agent_from_event(self, agent_data: Dict[str, Any]):
-        """Spawn an agent from a real-time agent_created event."""
+        """Spawn an agent announced in a real-time agents_delta event."""
         agent = self._create_agent_from_data(agent_data)
         self.agents.append(agent)
         self.managed_agent_ids.add(agent_data["agent_id"])
@@ -165,7 +165,7 @@ class LangGraphAgent(BaseAgent):
         # If LLM is disabled, use strategy system (ML + heuristic)
         if not self.enable_llm or self.llm is None:
             logger.debug("[%s] Using strategy system (ML/heuristic)", self.name)
-            decision_dict = self._strategy_based_decision(state)
+            decision_dict = await self._strategy_based_decision(state)
             state["action"] = decision_dict
             state["decision"] = decision_dict.get("reasoning", "Strategy-based decision")
             self.last_mid_prices = mid_prices
@@ -192,7 +192,7 @@ class LangGraphAgent(BaseAgent):
             # Ensure cached action is valid
             if cached_action is None or not isinstance(cached_action, dict):
                 logger.warning("[%s] Cached action is invalid, using strategy", self.name)
-                state["action"] = self._strategy_based_decision(state)
+                state["action"] = await self._strategy_based_decision(state)
             else:
                 state["action"] = cached_action
             state["decision"] = cached.get("decision", state["action"].get("reasoning", "Cached decision"))
@@ -241,13 +241,13 @@ Decide: BUY/SELL/HOLD. Respond ONLY with JSON:
         except json.JSONDecodeError as e:
             logger.warning("[%s] JSON parse error: %s | content=%s", self.name, e, content[:200] if 'content' in locals() else 'N/A')
             logger.info("[%s] Falling back to strategy system due to LLM parse error", self.name)
-            fallback_action = self._strategy_based_decision(state)
+            fallback_action = await self._strategy_based_decision(state)
             state["action"] = fallback_action
             state["decision"] = fallback_action.get("reasoning", "LLM parse error, using strategy")
         except Exception as e:
             logger.exception("[%s] Decision error: %s", self.name, e)
             logger.info("[%s] Falling back to strategy system due to LLM error", self.name)
-            fallback_action = self._strategy_based_decision(state)
+            fallback_action = await self._strategy_based_decision(state)
             state["action"] = fallback_action
             state["decision"] = fallback_action.get("reasoning", "LLM error, using strategy")
         
@@ -575,7 +575,7 @@ Make decisions based on market conditions, news, and your risk tolerance."""
         async with DECISION_CACHE_LOCK:
             DECISION_CACHE[cache_key] = (time.time(), payload)
     
-    def _strategy_based_decision(self, state: AgentState) -> Dict[str, Any]:
+    async def _strategy_based_decision(self, state: AgentState) -> Dict[str, Any]:
         """
         Use strategy system (ML + heuristic) to make trading decisions.
         Supports both long and short positions.
@@ -587,9 +587,8 @@ Make decisions based on market conditions, news, and your risk tolerance."""
         if not orderbooks:
             return {"action": "HOLD", "reasoning": "No orderbook data available"}
         
-        # Find best opportunity across instruments
-        best_decision = None
-        best_score = 0.0
+        # Build a market context per tradable instrument
+        contexts = []
         
         # Convert to list and shuffle to randomize order
         instrument_list = list(orderbooks.items())
@@ -667,19 +666,24 @@ Make decisions based on market conditions, news, and your risk tolerance."""
                 }
             )
             
-            # Use strategy system to make decision
-            try:
-                decision = self.strategy.decide(context)
-                if decision:
-                    logger.debug("[%s] Strategy returned decision: %s (score=%.3f) for symbol %s", 
-                               self.name, decision.action, decision.score, symbol_id)
-                    if decision.score > best_score:
-                        best_score = decision.score
-                        best_decision = decision
-                else:
-                    logger.debug("[%s] Strategy returned None (HOLD) for symbol %s", self.name, symbol_id)
-            except Exception as e:
-                logger.warning("[%s] Strategy decision error: %s", self.name, e)
+            contexts.append(context)
+        
+        # Use strategy system to decide for all instruments in one batch;
+        # a failing instrument comes back as None (HOLD) without losing the rest
+        decisions = await self.strategy.decide_batch_async(contexts)
+        
+        # Find best opportunity across instruments
+        best_decision = None
+        best_score = 0.0
+        for context, decision in zip(contexts, decisions):
+            if decision:
+                logger.debug("[%s] Strategy returned decision: %s (score=%.3f) for symbol %s", 
+                           self.name, decision.action, decision.score, context.symbol_id)
+                if decision.score > best_score:
+                    best_score = decision.score
+                    best_decision = decision
+            else:
+                logger.debug("[%s] Strategy returned None (HOLD) for symbol %s", self.name, context.symbol_id)
         
         # Convert TradingDecision to dict format
         if best_decision:
@@ -15,6 +15,31 @@ class HeuristicStrategy(BaseStrategy):
     Uses simple rules: momentum, spread capture, mean reversion, shorting.
     """
     
+    # personality -> (min cash as a multiple of mid price, decision rules tried in order)
+    _PERSONALITY_RULES = {
+        "conservative": (1.5, ("_conservative_decision",)),
+        "aggressive": (None, ("_aggressive_decision",)),
+        "news_trader": (None, ("_news_trader_decision",)),
+        "market_maker": (None, ("_market_maker_decision",)),
+        "momentum": (None, ("_momentum_decision",)),
+        "short_seller": (None, ("_short_seller_decision",)),
+        "whale": (2.0, ("_whale_decision",)),
+        "predator": (1.5, (
+            "_predator_counter_move",
+            "_predator_imbalance",
+            "_predator_take_profit",
+            "_predator_fade_extreme",
+        )),
+    }
+    _DEFAULT_RULES = (None, ("_neutral_decision",))  # neutral or unknown
+    
+    def __init__(self, personality: str):
+        super().__init__(personality)
+        # Resolve the personality dispatch once instead of per tick
+        min_cash_ratio, rule_names = self._PERSONALITY_RULES.get(personality, self._DEFAULT_RULES)
+        self._min_cash_ratio = min_cash_ratio
+        self._strategies = [getattr(self, name) for name in rule_names]
+    
     def decide(self, context: MarketContext) -> Optional[TradingDecision]:
         """Make trading decision based on heuristics."""
         # Calculate score for this opportunity
@@ -23,10 +48,16 @@ class HeuristicStrategy(BaseStrategy):
         if score <= 0:
             return None  # No good opportunity
         
-        # Determine action based on personality and context
-        decision = self._make_personality_decision(context, score)
+        # Personality needs enough cash to act at all
+        if self._min_cash_ratio is not None and context.cash < context.mid_price * self._min_cash_ratio:
+            return None
         
-        return decision
+        # First personality rule that fires wins
+        for strategy in self._strategies:
+            decision = strategy(context, score)
+            if decision:
+                return decision
+        return None
     
     def _calculate_opportunity_score(self, context: MarketContext) -> float:
         """Calculate opportunity score for this market context."""
@@ -50,36 +81,11 @@ class HeuristicStrategy(BaseStrategy):
         
         return score
     
-    def _make_personality_decision(self, context: MarketContext, base_score: float) -> Optional[TradingDecision]:
-        """Make decision based on personality."""
-        
-        if self.personality == "conservative":
-            return self._conservative_decision(context, base_score)
-        elif self.personality == "aggressive":
-            return self._aggressive_decision(context, base_score)
-        elif self.personality == "news_trader":
-            return self._news_trader_decision(context, base_score)
-        elif self.personality == "market_maker":
-            return self._market_maker_decision(context, base_score)
-        elif self.personality == "momentum":
-            return self._momentum_decision(context, base_score)
-        elif self.personality == "short_seller":
-            return self._short_seller_decision(context, base_score)
-        elif self.personality == "whale":
-            return self._whale_decision(context, base_score)
-        elif self.personality == "predator":
-            return self._predator_decision(context, base_score)
-        else:  # neutral or unknown
-            return self._neutral_decision(context, base_score)
-    
     def _conservative_decision(self, context: MarketContext, score: float) -> Optional[TradingDecision]:
         """
         Conservative: Value investor - buys on dips, holds long-term.
         Real-world behavior: Patient, buys undervalued, sells on significant gains (20%+).
         """
-        if context.cash < context.mid_price * 1.5:
-            return None
-        
         # VALUE BUYING: Buy on significant dips (value investing)
         if context.position_qty == 0:
             # Buy when price drops 2%+ (bargain hunting)
@@ -431,11 +437,8 @@ class HeuristicStrategy(BaseStrategy):
         """
         Whale: Makes very large trades to create significant price movements.
         Uses market orders frequently to move prices immediately.
+        Needs substantial cash (2x mid price) to make big moves.
         """
-        # Whale needs substantial cash to make big moves
-        if context.cash < context.mid_price * 2:
-            return None
-        
         # WHALE BUY - Create upward price pressure
         if context.cash > context.mid_price * 1.5:
             # Buy on any positive momentum (very low threshold)
@@ -515,21 +518,13 @@ class HeuristicStrategy(BaseStrategy):
         
         return None
 
-    def _predator_decision(self, context: MarketContext, score: float) -> Optional[TradingDecision]:
+    def _predator_counter_move(self, context: MarketContext, score: float) -> Optional[TradingDecision]:
         """
         Predator: Counters whale movements by taking opposite positions.
         Detects whale activity through large price movements and orderbook imbalances.
         Aims to profit from whale-induced volatility reversals.
+        Needs cash (1.5x mid price) to counter-trade.
         """
-        # Predator needs cash to counter-trade
-        if context.cash < context.mid_price * 1.5:
-            return None
-        
-        # Detect whale activity indicators
-        large_price_move = abs(context.price_change) > 0.002  # 0.2%+ move suggests whale
-        orderbook_imbalance = abs(context.orderbook_depth.get("bids_count", 0) - 
-                                  context.orderbook_depth.get("asks_count", 0)) > 10
-        
         # STRATEGY 1: Counter whale buying (price spike up)
         # When price spikes up, predator shorts/sells to profit from reversal
         if context.price_change > 0.002:  # Strong upward move (whale buying)
@@ -583,12 +578,21 @@ class HeuristicStrategy(BaseStrategy):
                     score=score * 1.8
                 )
         
+        return None
+    
+    def _predator_imbalance(self, context: MarketContext, score: float) -> Optional[TradingDecision]:
+        """Predator: Trade against orderbook imbalances left by a whale building a position."""
+        # Detect whale activity indicators
+        large_price_move = abs(context.price_change) > 0.002  # 0.2%+ move suggests whale
+        if not large_price_move:
+            return None
+        bids_count = context.orderbook_depth.get("bids_count", 0)
+        asks_count = context.orderbook_depth.get("asks_count", 0)
+        orderbook_imbalance = abs(bids_count - asks_count) > 10
+        
         # STRATEGY 3: Detect orderbook imbalance (whale building position)
         # Large imbalance suggests whale activity
-        if orderbook_imbalance and large_price_move:
-            bids_count = context.orderbook_depth.get("bids_count", 0)
-            asks_count = context.orderbook_depth.get("asks_count", 0)
-            
+        if orderbook_imbalance:
             # Many bids but few asks = whale buying, predator should short
             if bids_count > asks_count + 15 and context.price_change > 0.001:
                 if self.can_short(context):
@@ -618,6 +622,10 @@ class HeuristicStrategy(BaseStrategy):
                         score=score * 1.6
                     )
         
+        return None
+    
+    def _predator_take_profit(self, context: MarketContext, score: float) -> Optional[TradingDecision]:
+        """Predator: Take profit on long positions after a whale-induced spike."""
         # STRATEGY 4: Quick profit taking - if we have position and price moved favorably
         if context.position_qty > 0:
             # If we're long and price spiked (whale buying), take profit
@@ -634,6 +642,10 @@ class HeuristicStrategy(BaseStrategy):
                         score=score * 1.4
                     )
         
+        return None
+    
+    def _predator_fade_extreme(self, context: MarketContext, score: float) -> Optional[TradingDecision]:
+        """Predator: Fade moves that went too far too fast (mean reversion)."""
         # STRATEGY 5: Fade extreme moves (mean reversion)
         # If price moved too far too fast, bet on reversal
         if abs(context.price_change) > 0.005:  # Very large move
@@ -673,16 +685,17 @@ class HeuristicStrategy(BaseStrategy):
             # Buy on spread opportunities
             if context.spread_pct > 0.0005:  # Lower threshold
                 qty = min(12, int(context.cash / context.mid_price * 0.12))
-            price_variation = random.uniform(0.0, context.spread * 0.1)
-            return TradingDecision(
-                action="BUY",
-                symbol_id=context.symbol_id,
-                order_type="LIMIT",
-                price=round(context.best_bid + price_variation, 2),
-                quantity=qty,
-                reasoning=f"Neutral: Balanced trade (spread {context.spread_pct:.3%})",
-                score=score
-                )
+                if qty > 0:
+                    price_variation = random.uniform(0.0, context.spread * 0.1)
+                    return TradingDecision(
+                        action="BUY",
+                        symbol_id=context.symbol_id,
+                        order_type="LIMIT",
+                        price=round(context.best_bid + price_variation, 2),
+                        quantity=qty,
+                        reasoning=f"Neutral: Balanced trade (spread {context.spread_pct:.3%})",
+                        score=score
+                    )
             
             # Buy on price dips (value buying)
             if context.price_change < -0.005:  # Price dropped 0.5%+
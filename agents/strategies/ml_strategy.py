@@ -5,7 +5,7 @@ import numpy as np
 from typing import Optional
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
-import pickle
+import joblib
 import os
 
 from .base_strategy import BaseStrategy, MarketContext, TradingDecision
@@ -30,8 +30,8 @@ class MLStrategy(BaseStrategy):
         """Initialize or load the ML model."""
         if os.path.exists(self.model_path):
             try:
-                with open(self.model_path, 'rb') as f:
-                    self.model, self.scaler = pickle.load(f)
+                # mmap_mode shares the tree arrays across agent processes (read-only pages)
+                self.model, self.scaler = joblib.load(self.model_path, mmap_mode='r')
                 logger.info(f"Loaded ML model from {self.model_path}")
                 return
             except Exception as e:
@@ -88,7 +88,8 @@ class MLStrategy(BaseStrategy):
             
             y.append(label)
         
-        X = np.array(X)
+        # float32 matches the tree's internal dtype and halves feature memory traffic
+        X = np.array(X, dtype=np.float32)
         y = np.array(y)
         
         # Fit scaler and model
@@ -98,8 +99,7 @@ class MLStrategy(BaseStrategy):
         # Save model
         try:
             os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-            with open(self.model_path, 'wb') as f:
-                pickle.dump((self.model, self.scaler), f)
+            joblib.dump((self.model, self.scaler), self.model_path, compress=0)
         except Exception as e:
             logger.warning(f"Could not save model: {e}")
     
@@ -115,7 +115,7 @@ class MLStrategy(BaseStrategy):
             context.cash / (context.mid_price * 10) if context.mid_price > 0 else 0,  # Cash ratio
             1.0 if context.has_recent_news else 0.0,
             orderbook_depth / 10.0
-        ]])
+        ]], dtype=np.float32)
         
         return self.scaler.transform(features)
     
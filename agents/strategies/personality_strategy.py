@@ -1,7 +1,10 @@
 """Personality-based strategy router."""
 
+import asyncio
 import logging
-from typing import Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
 from .base_strategy import BaseStrategy, MarketContext, TradingDecision
 from .heuristic_strategy import HeuristicStrategy
@@ -9,6 +12,37 @@ from .ml_strategy import MLStrategy
 
 logger = logging.getLogger(__name__)
 
+_NO_MIN_SCORE = float("-inf")
+_NO_MAX_QTY = float("inf")
+
+# personality -> (min score, (min qty, max qty) or None, bounds apply to SELL only)
+_FILTER_RULES = {
+    "conservative": (0.3, (0, 5), False),      # Avoid large positions
+    "aggressive": (0.3, (0, 50), False),       # Can take larger positions
+    "short_seller": (0.2, (0, 20), True),      # Cap short positions only
+    "whale": (0.05, (50, _NO_MAX_QTY), False), # No cap, minimum 50 shares
+    "predator": (0.15, (30, 200), False),      # Medium-sized counter-trades
+}
+
+
+# Smallest batch worth handing to the thread pool. Only ML batches qualify:
+# sklearn's predict releases the GIL, while heuristic decide() is pure Python
+PARALLEL_MIN_CONTEXTS = 4
+# Shared by every agent in the process, created on first parallel batch
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="strategy")
+    return _executor
+
+
+def _clamp(value, lo, hi):
+    """Clamp value into [lo, hi] without min()/max() call overhead."""
+    return lo if value < lo else hi if value > hi else value
+
 
 class PersonalityStrategy(BaseStrategy):
     """
@@ -31,6 +65,11 @@ class PersonalityStrategy(BaseStrategy):
                 self.use_ml = False
         else:
             self.ml_strategy = None
+        
+        # Precompute personality risk filter (score gate + quantity bounds)
+        self._min_score, self._qty_bounds, self._bounds_sell_only = _FILTER_RULES.get(
+            personality, (_NO_MIN_SCORE, None, False)
+        )
     
     def decide(self, context: MarketContext) -> Optional[TradingDecision]:
         """
@@ -83,6 +122,36 @@ class PersonalityStrategy(BaseStrategy):
         
         return best_decision
     
+    def decide_batch(self, contexts: List[MarketContext]) -> List[Optional[TradingDecision]]:
+        """
+        Decide for several market contexts at once, preserving order.
+        A context whose decision fails yields None without affecting the others.
+        """
+        if not self._parallel_batch(contexts):
+            return [self._decide_safely(context) for context in contexts]
+        return list(_get_executor().map(self._decide_safely, contexts))
+    
+    async def decide_batch_async(self, contexts: List[MarketContext]) -> List[Optional[TradingDecision]]:
+        """decide_batch for the agent loop: a pooled ML batch is awaited instead of blocking it."""
+        if not self._parallel_batch(contexts):
+            return [self._decide_safely(context) for context in contexts]
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+        return list(await asyncio.gather(
+            *(loop.run_in_executor(executor, self._decide_safely, context) for context in contexts)
+        ))
+    
+    def _parallel_batch(self, contexts: List[MarketContext]) -> bool:
+        """Whether a batch is worth the thread pool hand-off."""
+        return self.use_ml and self.ml_strategy is not None and len(contexts) >= PARALLEL_MIN_CONTEXTS
+    
+    def _decide_safely(self, context: MarketContext) -> Optional[TradingDecision]:
+        try:
+            return self.decide(context)
+        except Exception as e:
+            logger.warning("Strategy decision error for symbol %s: %s", context.symbol_id, e)
+            return None
+    
     def _get_personality_weight(self) -> float:
         """Get weight for ML vs heuristic based on personality."""
         weights = {
@@ -100,52 +169,13 @@ class PersonalityStrategy(BaseStrategy):
     
     def _should_filter_decision(self, decision: TradingDecision, context: MarketContext) -> bool:
         """Filter decisions based on personality risk tolerance."""
-        if self.personality == "conservative":
-            # Conservative: trade on reasonable confidence (lowered threshold)
-            if decision.score < 0.3:  # Reduced from 0.6 to 0.3
-                return True
-            # Conservative: avoid large positions
-            if decision.quantity > 5:
-                decision.quantity = min(decision.quantity, 5)
-        
-        elif self.personality == "aggressive":
-            # Aggressive: trade more frequently
-            if decision.score < 0.3:
-                return True
-            # Aggressive: can take larger positions (increased from 20 to 50)
-            decision.quantity = min(decision.quantity, 50)
-        
-        elif self.personality == "market_maker":
+        if self.personality == "market_maker":
             # Market maker: only trade on good spreads
-            if context.spread_pct < 0.001:
-                return True
+            return context.spread_pct < 0.001
         
-        elif self.personality == "short_seller":
-            # Short seller: trade on reasonable opportunities
-            if decision.score < 0.2:
-                return True
-            # Short seller: can take larger short positions
-            if decision.action == "SELL" and decision.quantity > 0:
-                decision.quantity = min(decision.quantity, 20)
+        if decision.score < self._min_score:
+            return True
         
-        elif self.personality == "whale":
-            # Whale: trade on very low thresholds to create volatility
-            if decision.score < 0.05:
-                return True
-            # Whale: NO quantity cap - allow very large trades (50-200+ shares)
-            # This is intentional to create large price movements
-            # Just ensure minimum quantity
-            if decision.quantity < 50:
-                decision.quantity = max(decision.quantity, 50)  # Minimum 50 shares for whale
-        
-        elif self.personality == "predator":
-            # Predator: trade on counter-opportunities (lower threshold)
-            if decision.score < 0.15:
-                return True
-            # Predator: Medium-sized positions (30-80 shares) to counter whales
-            # Not as large as whale, but substantial enough to matter
-            
-            decision.quantity = max(decision.quantity, 30)  # Minimum 30 shares
-            decision.quantity = min(decision.quantity, 200)
+        if self._qty_bounds is not None and (not self._bounds_sell_only or decision.action == "SELL"):
+            decision.quantity = _clamp(decision.quantity, *self._qty_bounds)
         return False
-
@@ -8,11 +8,21 @@ import asyncio
 import json
 import logging
 import sys
-import time
 from typing import Dict, Any, Optional
 
 import websockets
 
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:  # orjson is optional for this standalone script
+    _dumps = json.dumps
+    _loads = json.loads
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -41,6 +51,44 @@ class AgentTester:
             "decision_making": False,
             "order_placement": False
         }
+        
+        # Static frames are encoded once; per-send fields are spliced onto the prefixes
+        self._register_frame = _dumps({
+            "type": "agent_register",
+            "agent_id": "test_agent_001",
+            "name": "TestAgent",
+            "personality": "aggressive",
+            "starting_capital": 100000.0
+        })
+        self._order_frame_prefix = _dumps({
+            "type": "add_order",
+            "symbol_id": 1,  # Assuming at least one instrument exists
+            "orderType": "LIMIT",
+            "agent_id": "test_agent_001"
+        })[:-1]
+        self._cancel_frame_prefix = _dumps({
+            "type": "cancel_order",
+            "symbol_id": 1
+        })[:-1]
+        
+        # Message type -> handler, built once so each message costs a single lookup
+        self._handlers = {
+            "instruments": self._on_instruments,
+            "orderbooks": self._on_orderbooks,
+            "orderbook_delta": self._on_orderbook_delta,
+            "portfolio_update": self._on_portfolio_update,
+            "agent_registered": self._on_agent_registered,
+            "news": self._on_news,
+            "news_history": self._on_news_history,
+        }
+    
+    def _order_frame(self, side: str, price: float, quantity: int) -> str:
+        """Build an add_order frame from the pre-encoded static fields."""
+        return f'{self._order_frame_prefix},"side":"{side}","price":{float(price)!r},"quantity":{int(quantity)}}}'
+    
+    def _cancel_frame(self, order_id: int) -> str:
+        """Build a cancel_order frame from the pre-encoded static fields."""
+        return f'{self._cancel_frame_prefix},"orderId":{int(order_id)}}}'
     
     async def connect(self):
         """Connect to WebSocket server."""
@@ -58,13 +106,7 @@ class AgentTester:
     async def register_agent(self):
         """Register as a test agent."""
         try:
-            await self.ws.send(json.dumps({
-                "type": "agent_register",
-                "agent_id": "test_agent_001",
-                "name": "TestAgent",
-                "personality": "aggressive",
-                "starting_capital": 100000.0
-            }))
+            await self.ws.send(self._register_frame)
             logger.info("✓ Agent registration sent")
             self.test_results["registration"] = True
             return True
@@ -74,61 +116,79 @@ class AgentTester:
     
     async def listen_for_updates(self, timeout: float = 10.0):
         """Listen for WebSocket messages and verify data."""
-        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
         
         try:
-            while time.time() - start_time < timeout:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
                 try:
-                    message = await asyncio.wait_for(self.ws.recv(), timeout=2.0)
-                    data = json.loads(message)
-                    msg_type = data.get("type")
-                    
-                    if msg_type == "instruments":
-                        instruments = data.get("data", [])
-                        if instruments:
-                            logger.info(f"✓ Received {len(instruments)} instruments")
-                            self.test_results["instruments"] = True
-                            self.instruments_received = True
-                    
-                    elif msg_type == "orderbooks":
-                        orderbooks = data.get("data", {})
-                        if orderbooks:
-                            logger.info(f"✓ Received orderbook updates for {len(orderbooks)} instruments")
-                            self.test_results["orderbook_updates"] = True
-                            self.orderbooks_received = True
-                            
-                            # Check if orderbooks have liquidity
-                            for symbol_id, ob in orderbooks.items():
-                                bids = ob.get("bids", [])
-                                asks = ob.get("asks", [])
-                                if bids and asks:
-                                    logger.info(f"  Instrument {symbol_id}: {len(bids)} bids, {len(asks)} asks")
-                    
-                    elif msg_type == "portfolio_update":
-                        logger.info("✓ Received portfolio update")
-                        self.test_results["portfolio"] = True
-                        self.portfolio_received = True
-                    
-                    elif msg_type == "agent_registered":
-                        logger.info("✓ Agent registered successfully")
-                        self.test_results["registration"] = True
-                    
-                    elif msg_type == "news":
-                        logger.info("✓ Received news update")
-                    
-                    elif msg_type == "news_history":
-                        news = data.get("data", [])
-                        logger.info(f"✓ Received {len(news)} news items")
-                
+                    batch = [await asyncio.wait_for(self.ws.recv(), timeout=remaining)]
                 except asyncio.TimeoutError:
-                    continue
+                    break
                 except websockets.exceptions.ConnectionClosed:
                     logger.warning("Connection closed")
                     break
+                
+                # Drain frames that are already buffered; recv() returns them without suspending
+                while getattr(self.ws, "messages", None):
+                    batch.append(await self.ws.recv())
+                
+                for message in batch:
+                    self._process_message(message)
         
         except Exception as e:
             logger.error(f"Error listening: {e}")
     
+    def _process_message(self, message):
+        """Record what a single server message tells us about the agent."""
+        data = _loads(message)
+        handler = self._handlers.get(data.get("type"))
+        if handler:
+            handler(data.get("data"))
+    
+    def _on_instruments(self, instruments):
+        if instruments:
+            logger.info(f"✓ Received {len(instruments)} instruments")
+            self.test_results["instruments"] = True
+            self.instruments_received = True
+    
+    def _on_orderbooks(self, orderbooks):
+        if orderbooks:
+            logger.info(f"✓ Received orderbook updates for {len(orderbooks)} instruments")
+            self.test_results["orderbook_updates"] = True
+            self.orderbooks_received = True
+            
+            # Check if orderbooks have liquidity
+            for symbol_id, ob in orderbooks.items():
+                bids = ob.get("bids", [])
+                asks = ob.get("asks", [])
+                if bids and asks:
+                    logger.info(f"  Instrument {symbol_id}: {len(bids)} bids, {len(asks)} asks")
+    
+    def _on_orderbook_delta(self, deltas):
+        if deltas:
+            logger.info(f"✓ Received orderbook deltas for {len(deltas)} instruments")
+            self.test_results["orderbook_updates"] = True
+            self.orderbooks_received = True
+    
+    def _on_portfolio_update(self, _payload):
+        logger.info("✓ Received portfolio update")
+        self.test_results["portfolio"] = True
+        self.portfolio_received = True
+    
+    def _on_agent_registered(self, _payload):
+        logger.info("✓ Agent registered successfully")
+        self.test_results["registration"] = True
+    
+    def _on_news(self, _payload):
+        logger.info("✓ Received news update")
+    
+    def _on_news_history(self, news):
+        logger.info(f"✓ Received {len(news or [])} news items")
+    
     async def test_order_placement(self):
         """Test placing an order."""
         try:
@@ -141,23 +201,13 @@ class AgentTester:
             await asyncio.sleep(1)
             
             # Try to place a test order (we'll cancel it immediately)
-            test_order = {
-                "type": "add_order",
-                "symbol_id": 1,  # Assuming at least one instrument exists
-                "side": "BUY",
-                "orderType": "LIMIT",
-                "price": 100.0,
-                "quantity": 1,
-                "agent_id": "test_agent_001"
-            }
-            
-            await self.ws.send(json.dumps(test_order))
+            await self.ws.send(self._order_frame("BUY", 100.0, 1))
             logger.info("✓ Test order sent")
             
             # Wait for response
             try:
                 response = await asyncio.wait_for(self.ws.recv(), timeout=5.0)
-                data = json.loads(response)
+                data = _loads(response)
                 if data.get("type") == "order_response":
                     result = data.get("data", {})
                     if result.get("status") == "success":
@@ -168,12 +218,7 @@ class AgentTester:
                         # Cancel the test order
                         order_id = result.get("orderId")
                         if order_id:
-                            cancel_msg = {
-                                "type": "cancel_order",
-                                "symbol_id": 1,
-                                "orderId": int(order_id)
-                            }
-                            await self.ws.send(json.dumps(cancel_msg))
+                            await self.ws.send(self._cancel_frame(order_id))
                             logger.info("✓ Test order cancelled")
                         return True
                     else:
@@ -310,5 +355,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:  # uvloop is optional; fall back to the default event loop
+        pass
     asyncio.run(main())
 
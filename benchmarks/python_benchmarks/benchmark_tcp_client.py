@@ -1,10 +1,11 @@
 """Benchmark TCP client connection pooling and message handling."""
 
+import asyncio
 import time
 import socket
+import struct
 import threading
 import pytest
-from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 import random
@@ -41,7 +42,8 @@ class MockTCPServer:
             self.port = self._find_free_port()
         else:
             self.port = port
-        self.sock = None
+        self.loop = None
+        self.server = None
         self.running = False
         self.thread = None
     
@@ -59,41 +61,66 @@ class MockTCPServer:
         raise RuntimeError("Could not find a free port")
     
     def start(self):
-        """Start mock server."""
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.sock.bind((self.host, self.port))
-        self.sock.listen(5)
+        """Start mock server on a dedicated thread running its own event loop."""
+        started = threading.Event()
+        self.loop = asyncio.new_event_loop()
         self.running = True
         
-        def handle_client(client_sock):
-            while self.running:
-                try:
-                    data = client_sock.recv(4096)
+        async def handle_client(reader, writer):
+            # Like ob_server: a FRAMED request switches replies to a length prefix
+            framed = False
+            try:
+                while True:
+                    data = await reader.read(4096)
                     if not data:
                         break
-                    # Echo back response
-                    client_sock.send(b"OK 12345\n")
-                except:
-                    break
-            client_sock.close()
+                    if data.strip() == b"FRAMED":
+                        framed = True
+                        reply = b"OK FRAMED\n"
+                    else:
+                        reply = b"OK 12345\n"
+                    writer.write(struct.pack(">I", len(reply)) + reply if framed else reply)
+                    await writer.drain()
+            except (asyncio.CancelledError, ConnectionError, OSError):
+                # Cancelled on shutdown while parked on an idle pooled connection
+                pass
+            finally:
+                writer.close()
         
-        def accept_loop():
-            while self.running:
-                try:
-                    client, _ = self.sock.accept()
-                    threading.Thread(target=handle_client, args=(client,), daemon=True).start()
-                except:
-                    break
+        async def serve():
+            self.server = await asyncio.start_server(
+                handle_client, self.host, self.port, reuse_address=True
+            )
+            started.set()
+            try:
+                await self.server.serve_forever()
+            except asyncio.CancelledError:
+                pass
         
-        self.thread = threading.Thread(target=accept_loop, daemon=True)
+        def run_loop():
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.loop.run_until_complete(serve())
+            finally:
+                # Tear down client handlers still parked on pooled connections
+                pending = asyncio.all_tasks(self.loop)
+                for task in pending:
+                    task.cancel()
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                self.loop.close()
+        
+        self.thread = threading.Thread(target=run_loop, daemon=True)
         self.thread.start()
+        if not started.wait(timeout=5.0):
+            raise RuntimeError("Mock server failed to start")
     
     def stop(self):
         """Stop mock server."""
         self.running = False
-        if self.sock:
-            self.sock.close()
+        if self.server and self.loop:
+            self.loop.call_soon_threadsafe(self.server.close)
+        if self.thread:
+            self.thread.join(timeout=5.0)
 
 
 @pytest.fixture
@@ -151,18 +178,21 @@ def test_tcp_client_without_pooling(benchmark, mock_server):
 def test_concurrent_requests(benchmark, mock_server):
     """Benchmark concurrent TCP requests."""
     client = OrderBookClient('localhost', mock_server.port, use_pooling=True, max_connections=10)
+    # One loop for every round so pooled streams stay warm between iterations
+    loop = asyncio.new_event_loop()
+    
+    async def fan_out():
+        return await asyncio.gather(*[client.send_command_async(f"SNAPSHOT {i}") for i in range(100)])
     
     def concurrent_requests():
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(client._send_raw_command, f"SNAPSHOT {i}") 
-                      for i in range(100)]
-            results = [f.result() for f in futures]
-        return len(results)
+        results = loop.run_until_complete(fan_out())
+        return sum(r.startswith("OK") for r in results)
     
     result = benchmark(concurrent_requests)
     assert result == 100
     
     client.close()
+    loop.close()
 
 
 if __name__ == '__main__':
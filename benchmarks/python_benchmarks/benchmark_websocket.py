@@ -1,6 +1,6 @@
 """Benchmark WebSocket message handling and serialization."""
 
-import json
+import orjson
 import pytest
 import sys
 import os
@@ -13,7 +13,7 @@ else:
     # Fallback: try absolute path in Docker
     sys.path.insert(0, '/app/websocket_server')
 
-from message_models import OrderPlacedMessage, OrderPlacedPayload, OrderBookMessage
+from message_models import AddOrderRequest, OrderPlacedMessage, OrderPlacedPayload, OrderBookMessage
 
 
 def test_order_message_serialization(benchmark):
@@ -32,19 +32,41 @@ def test_order_message_serialization(benchmark):
     message = OrderPlacedMessage(data=payload)
     
     def serialize():
-        return json.dumps(message.model_dump())
+        # Rust-backed serializer, no intermediate dict
+        return message.model_dump_json()
     
     result = benchmark(serialize)
     assert isinstance(result, str)
     assert "order_placed" in result
 
 
+def test_order_event_dict_serialization(benchmark):
+    """Benchmark encoding an order_placed event from a plain dict, as the broadcast path does."""
+    order = {
+        "agent_id": "test_agent",
+        "agent_name": "Test Agent",
+        "symbol_id": 1,
+        "ticker": "TEST",
+        "side": "BUY",
+        "order_type": "LIMIT",
+        "price": 10000.0,
+        "quantity": 100,
+        "timestamp": "2025-01-01T00:00:00Z"
+    }
+    
+    def serialize():
+        return orjson.dumps({"type": "order_placed", "version": 1, "data": order})
+    
+    result = benchmark(serialize)
+    assert b"order_placed" in result
+
+
 def test_order_message_deserialization(benchmark):
     """Benchmark order message JSON deserialization."""
-    json_str = '{"type":"order_placed","version":1,"data":{"agent_id":"test_agent","agent_name":"Test Agent","symbol_id":1,"ticker":"TEST","side":"BUY","order_type":"LIMIT","price":10000.0,"quantity":100,"timestamp":"2025-01-01T00:00:00Z"}}'
+    json_str = b'{"type":"order_placed","version":1,"data":{"agent_id":"test_agent","agent_name":"Test Agent","symbol_id":1,"ticker":"TEST","side":"BUY","order_type":"LIMIT","price":10000.0,"quantity":100,"timestamp":"2025-01-01T00:00:00Z"}}'
     
     def deserialize():
-        data = json.loads(json_str)
+        data = orjson.loads(json_str)
         return OrderPlacedMessage(**data)
     
     result = benchmark(deserialize)
@@ -52,6 +74,26 @@ def test_order_message_deserialization(benchmark):
     assert result.data.side == "BUY"
 
 
+def test_add_order_validation(benchmark):
+    """Benchmark validating and normalizing an inbound add_order message."""
+    message = orjson.loads(b'{"type":"add_order","symbol_id":1,"side":"buy","orderType":"limit","price":150.5,"quantity":100,"agent_id":"test_agent"}')
+    
+    result = benchmark(AddOrderRequest.model_validate, message)
+    assert result.side == "BUY"
+    assert result.order_type == "LIMIT"
+
+
+def test_market_order_validation(benchmark):
+    """Benchmark validating a MARKET add_order; agents send these with price 0 or no price."""
+    message = orjson.loads(b'{"type":"add_order","symbol_id":1,"side":"sell","orderType":"MARKET","price":0,"quantity":5,"agent_id":"test_agent"}')
+
+    result = benchmark(AddOrderRequest.model_validate, message)
+    assert result.order_type == "MARKET"
+    assert result.price == 0
+    del message["price"]
+    assert AddOrderRequest.model_validate(message).price == 0
+
+
 def test_orderbook_message_serialization(benchmark):
     """Benchmark orderbook message JSON serialization."""
     message = OrderBookMessage(
@@ -64,7 +106,7 @@ def test_orderbook_message_serialization(benchmark):
     )
     
     def serialize():
-        return json.dumps(message.model_dump())
+        return message.model_dump_json()
     
     result = benchmark(serialize)
     assert isinstance(result, str)
@@ -84,8 +126,8 @@ def test_large_message_handling(benchmark):
     }
     
     def serialize_deserialize():
-        json_str = json.dumps(large_data)
-        return json.loads(json_str)
+        json_bytes = orjson.dumps(large_data)
+        return orjson.loads(json_bytes)
     
     result = benchmark(serialize_deserialize)
     assert result["type"] == "orderbooks"
@@ -5,21 +5,24 @@ Connects to OrderBook service via WebSocket and REST API.
 """
 
 import asyncio
-import json
 import logging
 import os
-from typing import Optional
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+import msgpack
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
 import uvicorn
+import websockets
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="Trading Dashboard")
+app = FastAPI(title="Trading Dashboard", default_response_class=ORJSONResponse)
 
 # Serve static assets (CSS/JS) from /static
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -39,8 +42,33 @@ ORDERBOOK_PORT = int(os.getenv("ORDERBOOK_PORT", "8000"))
 ORDERBOOK_WS_URL = f"ws://{ORDERBOOK_HOST}:{ORDERBOOK_PORT}/ws"
 ORDERBOOK_API_URL = f"http://{ORDERBOOK_HOST}:{ORDERBOOK_PORT}/api"
 
-# HTTP client for REST API calls
-http_client = httpx.AsyncClient(timeout=10.0)
+# Outbound WebSocket batching: messages arriving within the window are sent as one JSON array frame
+WS_BATCH_WINDOW = float(os.getenv("WS_BATCH_WINDOW_MS", "3")) / 1000.0
+WS_BATCH_MAX_MESSAGES = 64
+WS_BATCH_MAX_BYTES = 64 * 1024
+# Per-client outbound queue; a dashboard that falls this far behind is disconnected
+WS_SEND_QUEUE_SIZE = 256
+
+# HTTP client for REST API calls: one shared keep-alive pool sized for bursts of proxied calls
+# (http2/limits live on the transport; httpx ignores the client-level ones when a transport is given)
+http_client = httpx.AsyncClient(
+    timeout=10.0,
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=64, max_connections=128, keepalive_expiry=60),
+        retries=1,
+    ),
+)
+
+
+def _fast_json(response: httpx.Response):
+    """Decode a backend response body with orjson."""
+    return orjson.loads(response.content)
+
+
+def _passthrough(response: httpx.Response) -> Response:
+    """Relay a backend JSON response byte-for-byte, keeping its status code."""
+    return Response(content=response.content, media_type="application/json", status_code=response.status_code)
 
 
 @app.get("/")
@@ -55,7 +83,7 @@ async def health_check():
     try:
         # Check if OrderBook is accessible
         response = await http_client.get(f"{ORDERBOOK_API_URL.replace('/api', '')}/health")
-        orderbook_status = response.json() if response.status_code == 200 else {"status": "unreachable"}
+        orderbook_status = _fast_json(response) if response.status_code == 200 else {"status": "unreachable"}
     except Exception as e:
         orderbook_status = {"status": "error", "error": str(e)}
     
@@ -72,8 +100,7 @@ async def list_instruments():
     """List all instruments"""
     try:
         response = await http_client.get(f"{ORDERBOOK_API_URL}/instruments")
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -84,8 +111,7 @@ async def add_instrument(request: Request):
     try:
         data = await request.json()
         response = await http_client.post(f"{ORDERBOOK_API_URL}/instruments", json=data)
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         logger.error(f"Error adding instrument: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -96,8 +122,7 @@ async def remove_instrument(symbol_id: int):
     """Remove an instrument"""
     try:
         response = await http_client.delete(f"{ORDERBOOK_API_URL}/instruments/{symbol_id}")
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -107,8 +132,7 @@ async def list_agents():
     """List all agents"""
     try:
         response = await http_client.get(f"{ORDERBOOK_API_URL}/agents")
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -119,8 +143,7 @@ async def create_agent(request: Request):
     try:
         data = await request.json()
         response = await http_client.post(f"{ORDERBOOK_API_URL}/agents", json=data)
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         logger.error(f"Error creating agent: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -131,8 +154,7 @@ async def get_agent(agent_id: str):
     """Get agent details"""
     try:
         response = await http_client.get(f"{ORDERBOOK_API_URL}/agents/{agent_id}")
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -142,8 +164,7 @@ async def get_agent_portfolio(agent_id: str):
     """Get agent portfolio"""
     try:
         response = await http_client.get(f"{ORDERBOOK_API_URL}/agents/{agent_id}/portfolio")
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -154,8 +175,7 @@ async def get_agent_trades(agent_id: str, limit: Optional[int] = None):
     try:
         params = {"limit": limit} if limit else {}
         response = await http_client.get(f"{ORDERBOOK_API_URL}/agents/{agent_id}/trades", params=params)
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -165,8 +185,7 @@ async def get_leaderboard():
     """Get leaderboard"""
     try:
         response = await http_client.get(f"{ORDERBOOK_API_URL}/leaderboard")
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -177,8 +196,7 @@ async def publish_news(request: Request):
     try:
         data = await request.json()
         response = await http_client.post(f"{ORDERBOOK_API_URL}/news", json=data)
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         logger.error(f"Error publishing news: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -190,8 +208,7 @@ async def get_news(limit: Optional[int] = None):
     try:
         params = {"limit": limit} if limit else {}
         response = await http_client.get(f"{ORDERBOOK_API_URL}/news", params=params)
-        response.raise_for_status()
-        return response.json()
+        return _passthrough(response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -206,79 +223,316 @@ async def get_performance_metrics():
         url = f"{ORDERBOOK_API_URL}/performance"
         logger.info(f"Fetching performance metrics from: {url}")
         response = await http_client.get(url, timeout=5.0)
-        response.raise_for_status()
-        data = response.json()
+        if response.status_code != 200:
+            logger.error(f"HTTP error {response.status_code} fetching performance metrics from {url}: {response.text}")
+            return _default_metrics_response()
         logger.info(f"Performance metrics fetched successfully")
-        return data
-    except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error {e.response.status_code} fetching performance metrics from {url}: {e.response.text}")
-        return _get_default_metrics()
+        return _passthrough(response)
     except Exception as e:
         logger.error(f"Error fetching performance metrics from {url}: {e}")
-        return _get_default_metrics()
+        return _default_metrics_response()
+
+
+# Fallback body for /api/performance, encoded once at import
+_DEFAULT_METRICS_BYTES = orjson.dumps({
+    "trades_per_second": 0,
+    "orders_per_second": 0,
+    "total_volume": 0,
+    "total_trades": 0,
+    "total_orders": 0,
+    "queue_full_count": 0,
+    "queue_capacity": 1024,
+    "queue_usage_pct": 0,
+    "uptime_seconds": 0,
+    "avg_trades_per_second": 0,
+    "avg_orders_per_second": 0
+})
+
+
+def _default_metrics_response() -> Response:
+    """Return default performance metrics."""
+    return Response(content=_DEFAULT_METRICS_BYTES, media_type="application/json")
+
+
+# Shared upstream connection: one OrderBook WebSocket fanned out to every dashboard client
+_upstream_ws = None
+_upstream_lock = asyncio.Lock()
+_upstream_task: Optional[asyncio.Task] = None
+# Outbound queue per dashboard client, mapped to the writer task draining it
+dashboard_clients: Dict[asyncio.Queue, asyncio.Task] = {}
+_msgpack_clients: Set[asyncio.Queue] = set()
+# (queue, writer, wants_msgpack) per client, rebuilt only when a client joins or leaves
+_client_snapshot: Tuple[Tuple[asyncio.Queue, asyncio.Task, bool], ...] = ()
+# Frames that make up the state replayed to clients joining after the upstream sent them
+# (the OrderBook emits both compact orjson and spaced stdlib-json frames). The OrderBook
+# sends news_history only when a connection opens, and roster changes as agents_delta,
+# so later news and agents_delta frames are folded into the replayed state.
+_SNAPSHOT_PREFIXES = {
+    prefix.format(frame_type): frame_type
+    for frame_type in ("instruments", "orderbooks", "agents_snapshot", "agents_delta", "news_history", "news")
+    for prefix in ('{{"type":"{}"', '{{"type": "{}"')
+}
+# Latest replay frame per type; None marks one to re-encode from the state below
+_snapshot_frames: Dict[str, Optional[str]] = {}
+# agent_id -> agent, from the last agents_snapshot with later deltas applied
+_agents: Dict[str, dict] = {}
+# Matches the OrderBook's own news retention
+NEWS_HISTORY_LIMIT = 10_000
+# news_history items followed by every news item published since, oldest first
+_news_history: Deque[dict] = deque(maxlen=NEWS_HISTORY_LIMIT)
+UPSTREAM_RECONNECT_DELAY = 1.0
+_msgpack_packer = msgpack.Packer(use_bin_type=True)
+
+
+def _preencode(payload: dict) -> Tuple[str, bytes]:
+    """Encode a proxy-generated frame once, as JSON text and as msgpack."""
+    return orjson.dumps(payload).decode(), msgpack.packb(payload, use_bin_type=True)
+
+
+# Frames the proxy itself emits, indexed by the client's use_msgpack flag
+_UPSTREAM_UNAVAILABLE_FRAMES = _preencode({
+    "type": "error",
+    "message": "Failed to connect to OrderBook WebSocket"
+})
+_PONG_FRAMES = _preencode({"type": "pong"})
+_AGENT_REGISTER_REJECTED_FRAMES = _preencode({
+    "type": "error",
+    "message": "Agents must connect to the OrderBook WebSocket directly"
+})
+
+
+def _to_msgpack(data: str) -> bytes:
+    return msgpack.packb(orjson.loads(data), use_bin_type=True)
+
+
+def _add_client(out_q: asyncio.Queue, writer: asyncio.Task, use_msgpack: bool):
+    dashboard_clients[out_q] = writer
+    if use_msgpack:
+        _msgpack_clients.add(out_q)
+    _rebuild_client_snapshot()
+
+
+def _remove_client(out_q: asyncio.Queue):
+    dashboard_clients.pop(out_q, None)
+    _msgpack_clients.discard(out_q)
+    _rebuild_client_snapshot()
+
+
+def _rebuild_client_snapshot():
+    global _client_snapshot
+    _client_snapshot = tuple(
+        (out_q, writer, out_q in _msgpack_clients) for out_q, writer in dashboard_clients.items()
+    )
+
+
+def _track_frame(frame_type: str, data: str):
+    """Fold an upstream frame into the state replayed to joining clients."""
+    if frame_type in ("instruments", "orderbooks"):
+        _snapshot_frames[frame_type] = data
+        return
+    message = orjson.loads(data)
+    if frame_type == "agents_snapshot":
+        _agents.clear()
+        _agents.update((agent["agent_id"], agent) for agent in message.get("data") or ())
+        _snapshot_frames["agents_snapshot"] = data
+    elif frame_type == "agents_delta":
+        if "agents_snapshot" not in _snapshot_frames:
+            return  # no roster to apply it to; the periodic agents_snapshot brings one
+        for agent_id in message.get("removed") or ():
+            _agents.pop(agent_id, None)
+        for agent in (message.get("updated") or []) + (message.get("added") or []):
+            current = _agents.get(agent["agent_id"])
+            _agents[agent["agent_id"]] = {**current, **agent} if current else agent
+        _snapshot_frames["agents_snapshot"] = None
+    elif frame_type == "news_history":
+        _news_history.clear()
+        _news_history.extend(message.get("data") or ())
+        _snapshot_frames["news_history"] = data
+    elif message.get("data"):
+        _news_history.append(message["data"])
+        _snapshot_frames["news_history"] = None
+
+
+def _replay_frames():
+    """Replay frames for a joining client, re-encoding those changed by deltas or news."""
+    for frame_type, data in _snapshot_frames.items():
+        if data is None:
+            payload = list(_agents.values()) if frame_type == "agents_snapshot" else list(_news_history)
+            data = orjson.dumps({"type": frame_type, "version": 1, "data": payload}).decode()
+            _snapshot_frames[frame_type] = data
+        yield data
+
+
+def _fan_out(data: str):
+    """Queue an upstream frame for every dashboard client without awaiting any of them.
+    
+    JSON clients get the upstream text untouched; msgpack clients share a
+    single transcoded copy per frame.
+    """
+    for prefix, frame_type in _SNAPSHOT_PREFIXES.items():
+        if data.startswith(prefix):
+            try:
+                _track_frame(frame_type, data)
+            except (ValueError, KeyError, TypeError, AttributeError) as exc:
+                logger.warning("Could not fold %s frame into replay state: %s", frame_type, exc)
+            break
+    packed = None
+    for out_q, writer, wants_msgpack in _client_snapshot:
+        if wants_msgpack:
+            if packed is None:
+                packed = _to_msgpack(data)
+            frame = packed
+        else:
+            frame = data
+        try:
+            out_q.put_nowait(frame)
+        except asyncio.QueueFull:
+            logger.warning("Dashboard client too slow (%d queued frames), closing", out_q.qsize())
+            _remove_client(out_q)
+            writer.cancel()
 
 
-def _get_default_metrics():
-    """Return default performance metrics."""
-    return {
-        "trades_per_second": 0,
-        "orders_per_second": 0,
-        "total_volume": 0,
-        "total_trades": 0,
-        "total_orders": 0,
-        "queue_full_count": 0,
-        "queue_capacity": 1024,
-        "queue_usage_pct": 0,
-        "uptime_seconds": 0,
-        "avg_trades_per_second": 0,
-        "avg_orders_per_second": 0
-    }
+async def _upstream_reader():
+    """Own the shared OrderBook connection, reconnecting whenever it drops."""
+    global _upstream_ws
+    while True:
+        try:
+            async with _upstream_lock:
+                # Internal hop: deflate only costs CPU, and full snapshots can exceed the 1 MiB default
+                _upstream_ws = await websockets.connect(
+                    ORDERBOOK_WS_URL,
+                    compression=None,
+                    max_size=2**24,
+                    read_limit=2**20,
+                    write_limit=2**20,
+                    ping_interval=20,
+                    ping_timeout=10,
+                )
+            logger.info("Connected to OrderBook WebSocket at %s", ORDERBOOK_WS_URL)
+            # A restarted OrderBook has no news_history to resend; start from its state
+            _news_history.clear()
+            _snapshot_frames.pop("news_history", None)
+            async for data in _upstream_ws:
+                _fan_out(data)
+        except (OSError, websockets.exceptions.WebSocketException) as exc:
+            logger.warning("OrderBook WebSocket unavailable: %s", exc)
+        _upstream_ws = None
+        await asyncio.sleep(UPSTREAM_RECONNECT_DELAY)
+
+
+async def _send_upstream(data: str):
+    """Send a client message over the shared connection; the lock serialises writers."""
+    async with _upstream_lock:
+        if _upstream_ws is None:
+            raise ConnectionError("OrderBook WebSocket is not connected")
+        await _upstream_ws.send(data)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Open the shared OrderBook WebSocket"""
+    global _upstream_task
+    _upstream_task = asyncio.create_task(_upstream_reader())
 
 
 @app.websocket("/ws")
 async def websocket_proxy(websocket: WebSocket):
-    """Bidirectional proxy between dashboard and OrderBook WebSocket."""
-    await websocket.accept()
-    import websockets
+    """Proxy between a dashboard client and the shared OrderBook WebSocket.
     
-    try:
-        orderbook_ws = await websockets.connect(ORDERBOOK_WS_URL)
-    except Exception as exc:
-        await websocket.send_text(json.dumps({
-            "type": "error",
-            "message": f"Failed to connect to OrderBook WebSocket: {exc}"
-        }))
+    Upstream frames are read once and fanned out to every registered client.
+    Clients that request the ``msgpack`` subprotocol get binary msgpack frames;
+    the proxy transcodes to/from the OrderBook's JSON once per message.
+    """
+    use_msgpack = "msgpack" in websocket.scope.get("subprotocols", [])
+    await websocket.accept(subprotocol="msgpack" if use_msgpack else None)
+    
+    async def send_to_dashboard(frames):
+        # Frames are already encoded for this client; batches are wrapped in an array
+        if use_msgpack:
+            if len(frames) == 1:
+                await websocket.send_bytes(frames[0])
+            else:
+                await websocket.send_bytes(_msgpack_packer.pack_array_header(len(frames)) + b"".join(frames))
+        else:
+            await websocket.send_text(frames[0] if len(frames) == 1 else "[" + ",".join(frames) + "]")
+    
+    if _upstream_ws is None:
+        await send_to_dashboard([_UPSTREAM_UNAVAILABLE_FRAMES[use_msgpack]])
         await websocket.close()
         return
     
+    # Single writer per client: the shared upstream reader never blocks on a slow dashboard
+    out_q: asyncio.Queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+    for data in _replay_frames():
+        out_q.put_nowait(_to_msgpack(data) if use_msgpack else data)
+    
     async def forward_to_orderbook():
         try:
             while True:
-                data = await websocket.receive_text()
-                await orderbook_ws.send(data)
-        except (WebSocketDisconnect, websockets.exceptions.ConnectionClosed):
+                if use_msgpack:
+                    message = msgpack.unpackb(await websocket.receive_bytes(), raw=False)
+                    data = orjson.dumps(message).decode()
+                else:
+                    data = await websocket.receive_text()
+                    try:
+                        message = orjson.loads(data)
+                    except orjson.JSONDecodeError:
+                        message = None  # forwarded as-is; the OrderBook reports it
+                message_type = message.get("type") if isinstance(message, dict) else None
+                if message_type == "ping":
+                    # Answer heartbeats here so they are not broadcast to every viewer
+                    out_q.put_nowait(_PONG_FRAMES[use_msgpack])
+                elif message_type == "agent_register":
+                    # Registering would turn the shared connection into an agent socket
+                    out_q.put_nowait(_AGENT_REGISTER_REJECTED_FRAMES[use_msgpack])
+                else:
+                    await _send_upstream(data)
+        except (WebSocketDisconnect, ConnectionError, websockets.exceptions.ConnectionClosed, asyncio.QueueFull):
             pass
     
-    async def forward_to_dashboard():
+    async def write_to_dashboard():
+        loop = asyncio.get_running_loop()
         try:
-            async for data in orderbook_ws:
-                await websocket.send_text(data)
-        except (websockets.exceptions.ConnectionClosed, RuntimeError):
+            while True:
+                batch = [await out_q.get()]
+                size = len(batch[0])
+                deadline = loop.time() + WS_BATCH_WINDOW
+                # Coalesce a burst of updates into a single frame, bounded in count, size and time
+                while len(batch) < WS_BATCH_MAX_MESSAGES and size < WS_BATCH_MAX_BYTES:
+                    try:
+                        data = out_q.get_nowait()
+                    except asyncio.QueueEmpty:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            data = await asyncio.wait_for(out_q.get(), timeout=remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    batch.append(data)
+                    size += len(data)
+                await send_to_dashboard(batch)
+        except (WebSocketDisconnect, RuntimeError):
             pass
     
-    tasks = [
-        asyncio.create_task(forward_to_orderbook()),
-        asyncio.create_task(forward_to_dashboard())
-    ]
-    
-    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
-    for task in pending:
-        task.cancel()
+    writer = asyncio.create_task(write_to_dashboard())
+    reader = asyncio.create_task(forward_to_orderbook())
+    _add_client(out_q, writer, use_msgpack)
     
     try:
-        await orderbook_ws.close()
-    except Exception:
-        pass
+        await asyncio.wait([reader, writer], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        _remove_client(out_q)
+        # Python 3.10 (the image's runtime) has no TaskGroup: cancel the survivor and
+        # wait for it, shielded so a cancelled handler still finishes tearing down
+        await asyncio.shield(_close_client(websocket, reader, writer))
+
+
+async def _close_client(websocket: WebSocket, *tasks: asyncio.Task):
+    """Cancel a client's proxy tasks, reap them and close its socket."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
     try:
         await websocket.close()
     except Exception:
@@ -288,6 +542,10 @@ async def websocket_proxy(websocket: WebSocket):
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    if _upstream_task:
+        _upstream_task.cancel()
+    if _upstream_ws is not None:
+        await _upstream_ws.close()
     await http_client.aclose()
 
 
@@ -297,5 +555,15 @@ if __name__ == "__main__":
     print(f"OrderBook WebSocket: {ORDERBOOK_WS_URL}")
     print("Dashboard: http://localhost:8080")
     
-    uvicorn.run(app, host="0.0.0.0", port=8080, log_level="info")
+    # uvloop/httptools ship with uvicorn[standard]; deflate only burns CPU on the proxied frames
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8080,
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        ws_ping_interval=20,
+        ws_per_message_deflate=False,
+    )
 
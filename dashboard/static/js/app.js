@@ -238,7 +238,11 @@ window.tradingDashboard = function tradingDashboard() {
             this.connected = false;
             
             try {
-                this.ws = new WebSocket(wsUrl);
+                // Binary msgpack frames are smaller; stay on JSON if the decoder did not load
+                this.ws = typeof MessagePack !== 'undefined'
+                    ? new WebSocket(wsUrl, ['msgpack'])
+                    : new WebSocket(wsUrl);
+                this.ws.binaryType = 'arraybuffer';
                 
                 this.ws.onopen = () => {
                     console.log('WebSocket connected');
@@ -256,8 +260,15 @@ window.tradingDashboard = function tradingDashboard() {
                     this.resetHeartbeat();
                     
                     try {
-                        const message = JSON.parse(event.data);
-                        this.handleMessage(message);
+                        const message = typeof event.data === 'string'
+                            ? JSON.parse(event.data)
+                            : MessagePack.decode(new Uint8Array(event.data));
+                        // The proxy coalesces bursts of updates into a single array frame
+                        if (Array.isArray(message)) {
+                            message.forEach((m) => this.handleMessage(m));
+                        } else {
+                            this.handleMessage(message);
+                        }
                     } catch (error) {
                         console.error('Error parsing WebSocket message:', error, 'Raw data:', event.data);
                         // Try to handle as text if not JSON
@@ -292,6 +303,11 @@ window.tradingDashboard = function tradingDashboard() {
             }
         },
 
+        send(message) {
+            // Match the encoding negotiated at connect
+            this.ws.send(this.ws.protocol === 'msgpack' ? MessagePack.encode(message) : JSON.stringify(message));
+        },
+
         startHeartbeat() {
             this.stopHeartbeat();
             
@@ -300,7 +316,7 @@ window.tradingDashboard = function tradingDashboard() {
                 if (this.ws && this.ws.readyState === WebSocket.OPEN) {
                     try {
                         // Send a ping message (some servers support this)
-                        this.ws.send(JSON.stringify({ type: 'ping' }));
+                        this.send({ type: 'ping' });
                     } catch (error) {
                         console.error('Error sending heartbeat:', error);
                     }
@@ -370,6 +386,9 @@ window.tradingDashboard = function tradingDashboard() {
                     case 'orderbooks':
                         this.updateOrderBooks(message.data);
                         break;
+                    case 'orderbook_delta':
+                        this.applyOrderBookDelta(message.data);
+                        break;
                     case 'instruments':
                         this.instruments = message.data || [];
                         this.ensureInstrumentSelection();
@@ -377,9 +396,15 @@ window.tradingDashboard = function tradingDashboard() {
                     case 'agents_snapshot':
                         this.agents = message.data || [];
                         break;
+                    case 'agents_delta':
+                        this.applyAgentsDelta(message);
+                        break;
                     case 'order_placed':
                         this.handleOrderPlaced(message.data);
                         break;
+                    case 'order_placed_batch':
+                        (message.data || []).forEach(order => this.handleOrderPlaced(order));
+                        break;
                     case 'news':
                         if (message.data) {
                             this.newsItems.unshift(message.data);
@@ -545,6 +570,40 @@ window.tradingDashboard = function tradingDashboard() {
             }
         },
 
+        applyAgentsDelta(delta) {
+            const removed = new Set(delta.removed || []);
+            const changed = new Map(
+                [...(delta.updated || []), ...(delta.added || [])].map((agent) => [agent.agent_id, agent])
+            );
+            const agents = this.agents
+                .filter((agent) => !removed.has(agent.agent_id))
+                .map((agent) => {
+                    const update = changed.get(agent.agent_id);
+                    changed.delete(agent.agent_id);
+                    return update ? { ...agent, ...update } : agent;
+                });
+            this.agents = agents.concat([...changed.values()]);
+        },
+
+        applyOrderBookDelta(deltas) {
+            // Top-level JSON Patch ops; symbols we have no book for arrive in the next full snapshot
+            for (const { symbol_id: symbolId, patch } of deltas || []) {
+                const ob = this.orderbooks[String(symbolId)] || this.orderbooks[symbolId];
+                if (!ob) continue;
+                for (const op of patch) {
+                    const key = op.path.slice(1);
+                    if (op.op === 'remove') {
+                        delete ob[key];
+                    } else {
+                        ob[key] = op.value;
+                    }
+                }
+            }
+            if (this.selectedInstrumentId) {
+                this.loadInstrumentOrderBook();
+            }
+        },
+
         loadInstrumentOrderBook() {
             if (!this.selectedInstrumentId) return;
 
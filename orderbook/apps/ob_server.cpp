@@ -116,6 +116,9 @@ public:
 private:
     void handleClient(int clientSocket) {
         char buffer[4096];
+        // Switched on by a FRAMED request: replies then carry a 4-byte big-endian
+        // length prefix so clients read them exactly instead of scanning for terminators
+        bool framed = false;
         
         while (running_) {
             memset(buffer, 0, sizeof(buffer));
@@ -126,20 +129,50 @@ private:
             }
             
             std::string request(buffer, bytesRead);
-            std::string response = processRequest(request);
-            
-            // Process any pending events
-            if (service_) {
-                service_->processEvents();
+            std::string response;
+            if (trim(request) == "FRAMED") {
+                framed = true;
+                response = "OK FRAMED\n";
+            } else {
+                response = processRequest(request);
+                
+                // Process any pending events
+                if (service_) {
+                    service_->processEvents();
+                }
             }
             
-            send(clientSocket, response.c_str(), response.length(), 0);
+            if (!sendResponse(clientSocket, response, framed)) {
+                break;
+            }
         }
         
         std::cout << "Client disconnected" << std::endl;
         close(clientSocket);
     }
     
+    static bool sendAll(int socket, const char* data, std::size_t length) {
+        while (length > 0) {
+            ssize_t sent = send(socket, data, length, MSG_NOSIGNAL);
+            if (sent <= 0) {
+                return false;
+            }
+            data += sent;
+            length -= static_cast<std::size_t>(sent);
+        }
+        return true;
+    }
+    
+    static bool sendResponse(int socket, const std::string& response, bool framed) {
+        if (!framed) {
+            return sendAll(socket, response.data(), response.size());
+        }
+        const uint32_t length = htonl(static_cast<uint32_t>(response.size()));
+        std::string frame(reinterpret_cast<const char*>(&length), sizeof(length));
+        frame += response;
+        return sendAll(socket, frame.data(), frame.size());
+    }
+    
     static std::string trim(const std::string& input) {
         const auto start = input.find_first_not_of(" \t\r\n");
         if (start == std::string::npos) {
@@ -270,19 +303,38 @@ private:
             }
             
             std::ostringstream oss;
-            auto bids = service_->getBidsSnapshot(symbolId, 10);
-            auto asks = service_->getAsksSnapshot(symbolId, 10);
+            writeSnapshot(oss, symbolId);
+            return oss.str();
             
-            oss << "SNAPSHOT " << symbolId << "\n";
-            oss << "BIDS " << bids.size() << "\n";
-            for (const auto& l : bids) {
-                oss << l.price << " " << l.total << " " << l.numOrders << "\n";
+        } else if (cmd == "SNAPSHOTS") {
+            // Batched SNAPSHOT: one block per known symbol, then a terminator
+            std::ostringstream oss;
+            std::uint32_t symbolId;
+            while (iss >> symbolId) {
+                if (service_->hasInstrument(symbolId)) {
+                    writeSnapshot(oss, symbolId);
+                }
             }
-            oss << "ASKS " << asks.size() << "\n";
-            for (const auto& l : asks) {
-                oss << l.price << " " << l.total << " " << l.numOrders << "\n";
+            oss << "END_SNAPSHOTS\n";
+            return oss.str();
+            
+        } else if (cmd == "BATCH") {
+            // BATCH <count> followed by that many ADD/CANCEL lines; one reply line each
+            std::size_t count = 0;
+            iss >> count;
+            std::string line;
+            std::getline(iss, line);
+            
+            std::ostringstream oss;
+            for (std::size_t i = 0; i < count && std::getline(iss, line); ++i) {
+                line = trim(line);
+                if (line.rfind("ADD ", 0) == 0 || line.rfind("CANCEL ", 0) == 0) {
+                    oss << processRequest(line);
+                } else {
+                    oss << "ERROR Unsupported batch command\n";
+                }
             }
-            oss << "END\n";
+            oss << "END_BATCH\n";
             return oss.str();
             
         } else {
@@ -290,6 +342,22 @@ private:
         }
     }
     
+    void writeSnapshot(std::ostream& oss, std::uint32_t symbolId) {
+        auto bids = service_->getBidsSnapshot(symbolId, 10);
+        auto asks = service_->getAsksSnapshot(symbolId, 10);
+        
+        oss << "SNAPSHOT " << symbolId << "\n";
+        oss << "BIDS " << bids.size() << "\n";
+        for (const auto& l : bids) {
+            oss << l.price << " " << l.total << " " << l.numOrders << "\n";
+        }
+        oss << "ASKS " << asks.size() << "\n";
+        for (const auto& l : asks) {
+            oss << l.price << " " << l.total << " " << l.numOrders << "\n";
+        }
+        oss << "END\n";
+    }
+    
     void handleEvent(const events::Event& event) {
         // Events will be polled by clients via SNAPSHOT for now
         // Could extend to push events via separate connection
@@ -1,162 +1,678 @@
 """Broadcast utilities for websocket messages."""
 
 import asyncio
-import json
-from datetime import datetime
-from typing import Dict, Iterable, List, Optional
+import itertools
+import logging
+import socket
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
+import msgpack
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
 
-from message_models import (
-    AgentsSnapshotMessage,
-    InstrumentsMessage,
-    OrderBookMessage,
-    OrderPlacedMessage,
-)
+from models.agent import Agent
+from models.instrument import Instrument
+from models.news import News
 from state import (
     agent_manager,
     instrument_service,
     market_maker_service,
+    msgpack_connections,
+    news_service,
     ob_client,
     portfolio_tracker,
     regular_connections,
 )
 
-# Global sequence counter for orderbook broadcasts
-_broadcast_sequence = 0
-_sequence_lock = asyncio.Lock()
+logger = logging.getLogger(__name__)
+
+# Snapshots are keyed by int symbol_id; numpy scalars can leak in from the market maker
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Agents offering this subprotocol get broadcasts as msgpack instead of JSON
+MSGPACK_SUBPROTOCOL = "msgpack-v1"
+
+# Snapshot requests are coalesced: callers mark symbols dirty and one task ships a merged frame
+_pending_symbols: Set[int] = set()
+_pending_all = False
+_snapshot_wakeup = asyncio.Event()
+_snapshot_task: Optional[asyncio.Task] = None
+
+# order_placed events accumulate for one window and ship as a single frame
+ORDER_BATCH_WINDOW = 0.01
+_pending_orders: List[dict] = []
+_order_wakeup = asyncio.Event()
+_order_task: Optional[asyncio.Task] = None
+
+# Between full orderbook frames, ticks ship as per-symbol JSON Patch deltas
+FULL_SNAPSHOT_INTERVAL = 5.0
+# Last book shipped per symbol: the base every delta is computed against
+_last_snapshots: Dict[int, dict] = {}
+_last_full_snapshot = 0.0
+# Encoded '"symbol_id":{book}' member per symbol for splicing full frames,
+# and the symbols whose book changed since their fragment was encoded
+_snapshot_json: Dict[int, bytes] = {}
+_stale_snapshot_json: Set[int] = set()
+# Best (bid, ask) per symbol at the last portfolio revaluation
+_last_top_of_book: Dict[int, Tuple[Optional[float], Optional[float]]] = {}
+
+# Last agents_snapshot frame, keyed on every agent's (agent_id, version)
+_agents_snapshot_cache: Optional[Tuple[tuple, bytes]] = None
+# Agent version behind the last portfolio_update pushed to each agent
+_portfolio_versions: Dict[str, int] = {}
+# (instrument registry version, encoded instruments frame)
+_instruments_frame_cache: Optional[Tuple[int, bytes]] = None
+# (next news id, encoded news_history frame or None when there is no news)
+_news_history_frame_cache: Optional[Tuple[int, Optional[bytes]]] = None
 
+# Per-connection outbound frames buffered before the oldest is dropped
+CHANNEL_QUEUE_SIZE = 64
+# Broadcast frames a client may lose without catching up once before it is disconnected
+SLOW_CONSUMER_DROP_LIMIT = 4 * CHANNEL_QUEUE_SIZE
+# Linux-only; elsewhere bursts are sent uncorked
+_TCP_CORK = getattr(socket, "TCP_CORK", None)
+# Minimum kernel send buffer per client socket, so a corked burst of fan-out
+# frames fits without the relay stalling on a partial write
+SOCKET_SEND_BUFFER = 256 * 1024
 
-async def _get_next_sequence() -> int:
+# (epoch second, formatted prefix) behind iso_timestamp()
+_timestamp_prefix: Tuple[int, str] = (-1, "")
+
+# Global sequence counter for orderbook broadcasts; the event loop is the only writer
+_sequence_iter = itertools.count(1)
+
+
+def _get_next_sequence() -> int:
     """Get next sequence number for orderbook broadcast."""
-    global _broadcast_sequence
-    async with _sequence_lock:
-        _broadcast_sequence += 1
-        return _broadcast_sequence
+    return next(_sequence_iter)
+
+
+def iso_timestamp() -> str:
+    """UTC ISO-8601 timestamp with millisecond precision.
+    
+    The date/time part is formatted once per second and reused for every
+    frame within it.
+    """
+    global _timestamp_prefix
+    second, nanos = divmod(time.time_ns(), 1_000_000_000)
+    if _timestamp_prefix[0] != second:
+        _timestamp_prefix = (second, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second)))
+    return f"{_timestamp_prefix[1]}.{nanos // 1_000_000:03d}Z"
+
+
+def _encode(payload: dict) -> bytes:
+    """Serialize a broadcast payload once for every audience it is sent to."""
+    return orjson.dumps(payload, option=_ORJSON_OPTIONS)
+
+
+def _msgpack_default(obj):
+    # numpy scalars from the market maker, mirroring OPT_SERIALIZE_NUMPY
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+_msgpack_packer = msgpack.Packer(use_bin_type=True, default=_msgpack_default)
+
+
+def _make_patch(old: dict, new: dict) -> List[dict]:
+    """Build a JSON Patch (RFC 6902) turning one book snapshot into the next.
+    
+    Only top-level members are diffed: a tick usually moves one side of the
+    book, and replacing that side whole keeps client-side patching trivial.
+    """
+    patch = [
+        {"op": "replace" if key in old else "add", "path": f"/{key}", "value": value}
+        for key, value in new.items()
+        if key not in old or old[key] != value
+    ]
+    patch.extend({"op": "remove", "path": f"/{key}"} for key in old if key not in new)
+    return patch
+
+
+def _tune_socket(sock) -> None:
+    """Disable Nagle and make sure the send buffer holds a burst of frames.
+    
+    The buffer is only ever raised: setting SO_SNDBUF turns off the kernel's
+    autotuning for the socket, so one that has already grown is left alone.
+    """
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) < SOCKET_SEND_BUFFER:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_SEND_BUFFER)
+    except (AttributeError, OSError):
+        pass  # not a TCP socket (e.g. a unix socket); nothing to tune
+
+
+class TCPSocketMiddleware:
+    """Tune the client's TCP socket on websocket scopes and record it so fan-out can cork bursts.
+    
+    Must be the outermost app middleware: only there is ``send`` still uvicorn's
+    bound protocol method (Starlette wraps it further in). Other servers are
+    left alone and broadcasts simply go out on default socket options.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "websocket":
+            transport = getattr(getattr(send, "__self__", None), "transport", None)
+            sock = transport.get_extra_info("socket") if transport is not None else None
+            if sock is not None:
+                _tune_socket(sock)
+                if _TCP_CORK is not None:
+                    scope["tcp_socket"] = sock
+        await self.app(scope, receive, send)
 
 
-async def _send_to_dashboards(payload: dict):
-    """Send payload to all connected dashboard clients."""
+class ConnectionChannel:
+    """Bounded outbound queue and relay task for one websocket.
+    
+    Every frame for the socket goes through here, so it has a single writer and
+    frames leave in the order they were queued. Fan-out only enqueues, so a
+    slow client delays nobody but itself. When the queue is full the oldest
+    broadcast frame is dropped (newer market data supersedes it); direct
+    replies are never dropped, the sender waits for the backlog to drain
+    instead. A client that keeps losing frames without ever catching up is
+    disconnected rather than fed an ever-staler stream. A backlog of frames
+    is written under TCP_CORK so the kernel packs them into as few segments
+    as possible.
+    """
+
+    __slots__ = ("websocket", "frames", "maxsize", "ready", "drained", "task", "sock", "dropped")
+
+    def __init__(self, websocket: WebSocket, maxsize: int = CHANNEL_QUEUE_SIZE):
+        self.websocket = websocket
+        self.frames: Deque[Tuple[Union[str, bytes], bool]] = deque()
+        self.maxsize = maxsize
+        self.ready = asyncio.Event()
+        self.drained = asyncio.Event()
+        self.drained.set()
+        self.sock = websocket.scope.get("tcp_socket")
+        self.dropped = 0
+        self.task = asyncio.create_task(self._relay())
+
+    def push(self, frame: Union[str, bytes], droppable: bool = True):
+        if self.dropped >= SLOW_CONSUMER_DROP_LIMIT:
+            return  # being disconnected
+        frames = self.frames
+        if len(frames) >= self.maxsize:
+            for i, (_, queued_droppable) in enumerate(frames):
+                if queued_droppable:
+                    del frames[i]
+                    self.dropped += 1
+                    break
+            if self.dropped >= SLOW_CONSUMER_DROP_LIMIT:
+                self._disconnect_slow_consumer()
+                return
+        frames.append((frame, droppable))
+        self.ready.set()
+
+    async def reply(self, frame: Union[str, bytes]):
+        self.push(frame, droppable=False)
+        if len(self.frames) > self.maxsize:
+            # Nothing left to drop: the client is not reading, hold back its requests
+            self.drained.clear()
+            await self.drained.wait()
+
+    def _cork(self, on: bool) -> bool:
+        try:
+            self.sock.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, int(on))
+            return True
+        except (AttributeError, OSError):
+            self.sock = None  # not a TCP socket we can tune; stop trying
+            return False
+
+    async def _send(self, frame: Union[str, bytes]):
+        if isinstance(frame, bytes):
+            await self.websocket.send_bytes(frame)
+        else:
+            await self.websocket.send_text(frame)
+
+    async def _relay(self):
+        websocket = self.websocket
+        frames = self.frames
+        try:
+            while True:
+                if not frames:
+                    self.dropped = 0
+                    self.drained.set()
+                    self.ready.clear()
+                    await self.ready.wait()
+                backlog = len(frames)
+                corked = backlog > 1 and self.sock is not None and self._cork(True)
+                try:
+                    # Frames queued meanwhile wait for the next round
+                    while backlog and frames:
+                        backlog -= 1
+                        await self._send(frames.popleft()[0])
+                finally:
+                    if corked:
+                        self._cork(False)
+        except asyncio.CancelledError:
+            raise
+        except (WebSocketDisconnect, RuntimeError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.warning("Unexpected error relaying to websocket: %s", e)
+        finally:
+            self.drained.set()  # never leave a replying handler waiting on a dead socket
+        # The peer is gone: stop broadcasting to it
+        _channels.pop(websocket, None)
+        regular_connections.discard(websocket)
+        msgpack_connections.discard(websocket)
+
+    def _disconnect_slow_consumer(self):
+        logger.warning("Closing websocket that dropped %d frames without catching up", self.dropped)
+        self.close()
+        self.frames.clear()
+        # Deregistered from the task: fan-out may be iterating the connection sets right now
+        asyncio.create_task(_close_slow_consumer(self.websocket))
+
+    def close(self):
+        self.task.cancel()
+
+
+async def _close_slow_consumer(websocket: WebSocket):
+    _channels.pop(websocket, None)
+    regular_connections.discard(websocket)
+    msgpack_connections.discard(websocket)
+    try:
+        await websocket.close(code=1013)  # Try Again Later
+    except (RuntimeError, ConnectionError):
+        pass
+
+
+_channels: Dict[WebSocket, ConnectionChannel] = {}
+
+
+def _channel(websocket: WebSocket) -> ConnectionChannel:
+    channel = _channels.get(websocket)
+    if channel is None:
+        channel = _channels[websocket] = ConnectionChannel(websocket)
+    return channel
+
+
+async def reply(websocket: WebSocket, frame: Union[str, bytes]):
+    """Queue a direct reply behind anything already queued for this websocket."""
+    await _channel(websocket).reply(frame)
+
+
+def close_channel(websocket: WebSocket):
+    """Drop a disconnected websocket's outbound channel."""
+    msgpack_connections.discard(websocket)
+    channel = _channels.pop(websocket, None)
+    if channel:
+        channel.close()
+
+
+def _send_to_dashboards(message: bytes):
+    """Queue a serialized message for all connected dashboard clients."""
     if not regular_connections:
         return
-    disconnected: List[WebSocket] = []
-    message = json.dumps(payload)
-    for connection in list(regular_connections):
-        try:
-            await connection.send_text(message)
-        except Exception:
-            disconnected.append(connection)
-    for connection in disconnected:
-        regular_connections.discard(connection)
-
-
-async def _send_to_agents(payload: dict):
-    """Send payload to all connected agents."""
-    message = json.dumps(payload)
-    for agent_id in agent_manager.get_all_agent_ids():
-        ws = agent_manager.get_websocket(agent_id)
-        if ws:
-            try:
-                await ws.send_text(message)
-            except (WebSocketDisconnect, RuntimeError, ConnectionError):
-                pass
-            except Exception as e:
-                logger.warning(f"Unexpected error sending to agent {agent_id}: {e}")
+    _send_text_to_dashboards(message.decode())
 
 
-async def broadcast_instruments_update():
+def _send_text_to_dashboards(message: str):
+    """Queue an already-serialized message for all connected dashboard clients."""
+    # Iterated in place: fan-out never awaits, so the set cannot change underneath
+    channels = _channels
+    for connection in regular_connections:
+        channel = channels.get(connection) or _channel(connection)
+        channel.push(message)
+
+
+def _send_to_agents(message: bytes, payload: Optional[dict] = None):
+    """Queue a serialized message for all connected agents.
+    
+    msgpack agents share one packed copy, built from ``payload`` (or
+    transcoded from ``message``) only when one of them is connected.
+    """
+    packed = None
+    channels = _channels
+    # Agents parse bytes directly, so skip the str round-trip Starlette would re-encode
+    for ws in agent_manager.get_websockets():
+        channel = channels.get(ws) or _channel(ws)
+        if ws in msgpack_connections:
+            if packed is None:
+                packed = _msgpack_packer.pack(orjson.loads(message) if payload is None else payload)
+            channel.push(packed)
+        else:
+            channel.push(message)
+
+
+def encode_instruments(instruments: Iterable[Instrument]) -> bytes:
+    """Serialize an instruments message, identical for every recipient."""
+    # Trusted server-side data (shape documented by InstrumentsMessage): splice each
+    # instrument's cached JSON into the frame instead of re-serializing it
+    return b'{"type":"instruments","version":1,"data":[%s]}' % b",".join(
+        instrument.to_json() for instrument in instruments
+    )
+
+
+def instruments_frame() -> bytes:
+    """The current instruments message, re-encoded only when the registry changes."""
+    global _instruments_frame_cache
     instruments = instrument_service.list_instruments()
-    instrument_models = [
-        instrument.to_dict() for instrument in instruments
-    ]
-    message = InstrumentsMessage(data=instrument_models).model_dump()
-    await _send_to_dashboards(message)
-    await _send_to_agents(message)
-    await broadcast_orderbook_snapshots([inst.symbol_id for inst in instruments])
+    version = instrument_service.version
+    if _instruments_frame_cache is None or _instruments_frame_cache[0] != version:
+        _instruments_frame_cache = (version, encode_instruments(instruments))
+    return _instruments_frame_cache[1]
+
+
+def news_history_frame() -> Optional[bytes]:
+    """The news_history message sent on connect, re-encoded only after news is published."""
+    global _news_history_frame_cache
+    # next_news_id advances on every publish, so it doubles as the history version
+    version = news_service.next_news_id
+    if _news_history_frame_cache is None or _news_history_frame_cache[0] != version:
+        all_news = news_service.get_news()
+        frame = orjson.dumps(
+            {"type": "news_history", "data": [news.to_dict() for news in all_news]},
+            option=_ORJSON_OPTIONS,
+        ) if all_news else None
+        _news_history_frame_cache = (version, frame)
+    return _news_history_frame_cache[1]
+
+
+async def broadcast_instruments_update():
+    message = instruments_frame()
+    _send_to_dashboards(message)
+    _send_to_agents(message)
+    symbol_ids = instrument_service.symbol_ids()
+    _prune_snapshot_caches(symbol_ids)
+    await broadcast_orderbook_snapshots(symbol_ids)
+
+
+def _prune_snapshot_caches(symbol_ids: Iterable[int]):
+    """Forget every cached book of a symbol that is no longer listed.
+    
+    A removed instrument would otherwise ride along in every full frame. When
+    anything is dropped, the next frame is a full one so clients drop it too.
+    """
+    global _last_full_snapshot
+    listed = set(symbol_ids)
+    removed = [symbol_id for symbol_id in _last_snapshots.keys() | _last_top_of_book.keys()
+               if symbol_id not in listed]
+    if not removed:
+        return
+    for symbol_id in removed:
+        _last_snapshots.pop(symbol_id, None)
+        _snapshot_json.pop(symbol_id, None)
+        _stale_snapshot_json.discard(symbol_id)
+        _last_top_of_book.pop(symbol_id, None)
+    ob_client.forget_snapshots(removed)
+    _last_full_snapshot = 0.0
+
+
+def start_snapshot_broadcaster():
+    """Start the background task that ships coalesced orderbook snapshots."""
+    global _snapshot_task
+    if _snapshot_task is None or _snapshot_task.done():
+        _snapshot_task = asyncio.create_task(_snapshot_broadcaster())
 
 
 async def broadcast_orderbook_snapshots(symbol_ids: Optional[Iterable[int]] = None):
-    """Broadcast snapshots for specific instruments (or all if None)."""
+    """Queue snapshots for specific instruments (or all if None).
+    
+    Requests arriving before the broadcaster wakes up are merged into a single frame.
+    """
+    global _pending_all
     if symbol_ids:
-        target_ids = list({int(sid) for sid in symbol_ids})
+        _pending_symbols.update(map(int, symbol_ids))
     else:
-        target_ids = [inst.symbol_id for inst in instrument_service.list_instruments()]
+        _pending_all = True
+    _snapshot_wakeup.set()
+    start_snapshot_broadcaster()
 
+
+async def _snapshot_broadcaster():
+    global _pending_all
+    while True:
+        await _snapshot_wakeup.wait()
+        # Yield once so requests scheduled in the same loop iteration join this frame
+        await asyncio.sleep(0)
+        _snapshot_wakeup.clear()
+        
+        if _pending_all:
+            target_ids = instrument_service.symbol_ids()
+        else:
+            target_ids = list(_pending_symbols)
+        _pending_all = False
+        _pending_symbols.clear()
+        
+        try:
+            await _broadcast_snapshots_now(target_ids)
+        except Exception as exc:  # pragma: no cover - keep the broadcaster alive
+            logger.exception("Orderbook snapshot broadcast failed: %s", exc)
+
+
+async def _broadcast_snapshots_now(target_ids: Sequence[int]):
+    """Fetch and broadcast one merged snapshot frame for the given instruments."""
     if not target_ids:
         return
 
     snapshots: Dict[int, dict] = {}
     current_prices: Dict[int, float] = {}
-    for symbol_id in target_ids:
-        snapshot = ob_client.get_snapshot(symbol_id)
+    # Fetch every book in one batched backend round trip
+    results = await ob_client.get_snapshots_async(target_ids)
+    for symbol_id, snapshot in results.items():
         if snapshot.get("status") == "success":
             snapshots[symbol_id] = snapshot
-            bids = snapshot.get("bids", [])
-            asks = snapshot.get("asks", [])
-            if bids and asks:
-                mid_price = (bids[0]["price"] + asks[0]["price"]) / 2
-                current_prices[symbol_id] = mid_price
-            elif bids:
-                current_prices[symbol_id] = bids[0]["price"]
-            elif asks:
-                current_prices[symbol_id] = asks[0]["price"]
+            bids = snapshot.get("bids")
+            asks = snapshot.get("asks")
+            best_bid = bids[0]["price"] if bids else None
+            best_ask = asks[0]["price"] if asks else None
+            top = (best_bid, best_ask)
+            if _last_top_of_book.get(symbol_id) == top:
+                continue  # mark price unchanged: nothing to revalue
+            _last_top_of_book[symbol_id] = top
+            if best_bid is None:
+                if best_ask is not None:
+                    current_prices[symbol_id] = best_ask
+            elif best_ask is None:
+                current_prices[symbol_id] = best_bid
+            else:
+                current_prices[symbol_id] = (best_bid + best_ask) / 2
 
     if current_prices:
         portfolio_tracker.update_portfolio_values(current_prices)
+        _push_portfolio_updates()
 
-    if snapshots:
-        # Add sequence number and timestamp for tracking
-        sequence = await _get_next_sequence()
-        timestamp = datetime.utcnow().isoformat() + "Z"
-        
-        message = OrderBookMessage(
-            data=snapshots,
-            sequence=sequence,
-            timestamp=timestamp
-        ).model_dump()
-        await _send_to_dashboards(message)
-        await _send_to_agents(message)
+    if not snapshots:
+        return
+
+    global _last_full_snapshot
+    now = time.monotonic()
+    full = (
+        now - _last_full_snapshot >= FULL_SNAPSHOT_INTERVAL
+        or any(symbol_id not in _last_snapshots for symbol_id in snapshots)
+    )
+    if full:
+        # Catches a book fetched while its instrument was being removed
+        _prune_snapshot_caches(instrument_service.symbol_ids())
+        snapshots = {symbol_id: snapshot for symbol_id, snapshot in snapshots.items()
+                     if instrument_service.has_instrument(symbol_id)}
+    changed = {
+        symbol_id: snapshot
+        for symbol_id, snapshot in snapshots.items()
+        if _last_snapshots.get(symbol_id) != snapshot
+    }
+    if not full and not changed:
+        return  # nothing moved since the last frame
+    if not full:
+        deltas = [
+            {"symbol_id": symbol_id, "patch": _make_patch(_last_snapshots[symbol_id], snapshot)}
+            for symbol_id, snapshot in changed.items()
+        ]
+    _last_snapshots.update(changed)
+    _stale_snapshot_json.update(changed)
+
+    # Add sequence number and timestamp for tracking
+    sequence = _get_next_sequence()
+    timestamp = iso_timestamp()
+
+    if full:
+        # Periodic full frames carry every known book so dropped deltas heal
+        _last_full_snapshot = now
+        payload = {
+            "type": "orderbooks",
+            "version": 1,
+            "data": _last_snapshots,
+            "sequence": sequence,
+            "timestamp": timestamp,
+        }
+        message = _encode_full_snapshot(sequence, timestamp)
+    else:
+        payload = {
+            "type": "orderbook_delta",
+            "version": 1,
+            "data": deltas,
+            "sequence": sequence,
+            "timestamp": timestamp,
+        }
+        message = _encode(payload)
+    _send_to_dashboards(message)
+    _send_to_agents(message, payload)
+
+
+def _encode_full_snapshot(sequence: int, timestamp: str) -> bytes:
+    """Splice the full orderbooks frame from per-symbol JSON fragments.
+    
+    Only books that changed since the previous full frame are re-encoded, so
+    the frame costs the loop little more than a join.
+    """
+    return b'{"type":"orderbooks","version":1,"data":{%s},"sequence":%d,"timestamp":"%s"}' % (
+        _snapshot_json_members(),
+        sequence,
+        timestamp.encode(),
+    )
+
+
+def _snapshot_json_members() -> bytes:
+    for symbol_id in _stale_snapshot_json:
+        _snapshot_json[symbol_id] = b'"%d":%s' % (symbol_id, _encode(_last_snapshots[symbol_id]))
+    _stale_snapshot_json.clear()
+    return b",".join(_snapshot_json.values())
+
+
+def encode_orderbooks(symbol_ids: Iterable[int]) -> Optional[bytes]:
+    """Serialize the last broadcast books as one orderbooks frame for a joining client.
+    
+    This is exactly the state the next orderbook_delta applies to. Returns None
+    if any requested symbol has not been broadcast yet.
+    """
+    if not _last_snapshots or any(symbol_id not in _last_snapshots for symbol_id in symbol_ids):
+        return None
+    return b'{"type":"orderbooks","version":1,"data":{%s}}' % _snapshot_json_members()
+
+
+def encode_portfolio_update(agent: Agent) -> str:
+    """Serialize an agent's portfolio_update reply."""
+    return orjson.dumps(
+        {
+            "type": "portfolio_update",
+            "cash": agent.cash,
+            "positions": {k: v.to_dict() for k, v in agent.positions.items()},
+            "total_value": agent.total_value,
+            "pnl": agent.pnl,
+        },
+        option=_ORJSON_OPTIONS,
+    ).decode()
+
+
+def _push_portfolio_updates():
+    """Send connected agents their portfolio when a revaluation changed it."""
+    for ws in agent_manager.get_websockets():
+        agent = agent_manager.get_agent_by_websocket(ws)
+        if agent is None or _portfolio_versions.get(agent.agent_id) == agent.version:
+            continue
+        _portfolio_versions[agent.agent_id] = agent.version
+        _channel(ws).push(encode_portfolio_update(agent))
 
 
 async def broadcast_agents_snapshot():
-    agents = [agent.to_dict() for agent in agent_manager.list_agents()]
-    message = AgentsSnapshotMessage(data=agents).model_dump()
-    await _send_to_dashboards(message)
+    global _agents_snapshot_cache
+    if not regular_connections:
+        return
+    agents = agent_manager.list_agents()
+    key = tuple((agent.agent_id, agent.version) for agent in agents)
+    if _agents_snapshot_cache is None or _agents_snapshot_cache[0] != key:
+        # Splice each agent's cached JSON; only agents that changed are re-encoded
+        message = b'{"type":"agents_snapshot","version":1,"data":[%s]}' % b",".join(
+            agent.to_json() for agent in agents
+        )
+        _agents_snapshot_cache = (key, message)
+    _send_to_dashboards(_agents_snapshot_cache[1])
 
 
-async def broadcast_order_event(payload: OrderPlacedMessage):
-    data = payload.model_dump()
-    await _send_to_dashboards(data)
+async def broadcast_order_event(order: dict):
+    """Queue an order_placed event (shaped like OrderPlacedPayload) for dashboards.
+    
+    Events arriving within ORDER_BATCH_WINDOW are sent as one order_placed_batch frame.
+    """
+    global _order_task
+    if not regular_connections:
+        return
+    _pending_orders.append(order)
+    _order_wakeup.set()
+    if _order_task is None or _order_task.done():
+        _order_task = asyncio.create_task(_order_broadcaster())
 
 
-async def broadcast_news_update(news_payload: dict):
+async def _order_broadcaster():
+    while True:
+        await _order_wakeup.wait()
+        await asyncio.sleep(ORDER_BATCH_WINDOW)
+        _order_wakeup.clear()
+        
+        orders = _pending_orders[:]
+        _pending_orders.clear()
+        if not orders or not regular_connections:
+            continue
+        if len(orders) == 1:
+            message = {"type": "order_placed", "version": 1, "data": orders[0]}
+        else:
+            message = {"type": "order_placed_batch", "version": 1, "data": orders}
+        try:
+            _send_to_dashboards(_encode(message))
+        except Exception as exc:  # pragma: no cover - keep the broadcaster alive
+            logger.exception("Order event broadcast failed: %s", exc)
+
+
+def broadcast_news(news: News):
+    """News subscriber: queue a freshly published item for every client."""
     payload = {
         "type": "news",
         "version": 1,
-        "data": news_payload,
+        "data": news.to_dict(),
     }
-    await _send_to_dashboards(payload)
-    await _send_to_agents(payload)
+    message = _encode(payload)
+    _send_to_dashboards(message)
+    _send_to_agents(message, payload)
 
 
-async def broadcast_agent_created(agent_data: dict):
-    """Broadcast when a new agent is created (e.g., from UI)."""
+async def broadcast_agents_delta(
+    added: Iterable[dict] = (),
+    removed: Iterable[str] = (),
+    updated: Iterable[dict] = (),
+):
+    """Broadcast a roster change: one frame instead of a full agents_snapshot.
+    
+    Agent runners spawn agents from ``added`` (e.g. agents created from the UI).
+    """
     payload = {
-        "type": "agent_created",
-        "data": agent_data,
+        "type": "agents_delta",
+        "version": 1,
+        "added": list(added),
+        "removed": list(removed),
+        "updated": list(updated),
     }
     # Send to all connections (both dashboards and potential agent services)
-    message = json.dumps(payload)
-    disconnected: List[WebSocket] = []
-    for connection in list(regular_connections):
-        try:
-            await connection.send_text(message)
-        except (WebSocketDisconnect, RuntimeError, ConnectionError):
-            disconnected.append(connection)
-        except Exception as e:
-            logger.warning(f"Unexpected error broadcasting agent_created: {e}")
-            disconnected.append(connection)
-    for connection in disconnected:
-        regular_connections.discard(connection)
+    message = _encode(payload)
+    _send_to_dashboards(message)
     # Also send to already connected agents (for awareness)
-    await _send_to_agents(payload)
+    _send_to_agents(message, payload)
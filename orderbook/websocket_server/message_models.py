@@ -1,8 +1,12 @@
-"""Pydantic models for websocket messages."""
+"""Pydantic models for websocket messages.
+
+The broadcast path builds plain dicts of the same shape for trusted server-side
+data; these models document the wire format and validate client-facing payloads.
+"""
 
 from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 
 class InstrumentModel(BaseModel):
@@ -36,6 +40,60 @@ class AgentsSnapshotMessage(BaseModel):
     data: List[Dict[str, Any]]
 
 
+class AgentsDeltaMessage(BaseModel):
+    type: Literal["agents_delta"] = "agents_delta"
+    version: int = 1
+    added: List[Dict[str, Any]] = Field(default_factory=list)
+    removed: List[str] = Field(default_factory=list)  # agent_ids
+    updated: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+ORDER_SIDES = frozenset({"BUY", "SELL"})
+ORDER_TYPES = frozenset({"LIMIT", "MARKET"})
+
+
+class AddOrderRequest(BaseModel):
+    """Inbound ``add_order`` message, validated and normalized in one pass."""
+
+    symbol_id: int = 1
+    # Validated even when missing, so an absent side is rejected rather than sent as SELL
+    side: str = Field(default=None, validate_default=True)
+    order_type: str = Field(default="LIMIT", alias="orderType")
+    # Non-finite values would slip past the positivity checks (inf > 0, NaN compares
+    # false) and then break int() in the backend command, so both fields reject them
+    quantity: float = Field(gt=0, allow_inf_nan=False)
+    # Positive only for LIMIT orders (see _check_price): agents send MARKET orders with price 0
+    price: Optional[float] = Field(default=None, allow_inf_nan=False)
+    agent_id: Optional[str] = None
+
+    @field_validator("side", mode="before")
+    @classmethod
+    def _check_side(cls, value):
+        side = value.upper() if isinstance(value, str) else value
+        if side not in ORDER_SIDES:
+            raise ValueError(f"must be 'buy' or 'sell', got '{value}'")
+        return side
+
+    @field_validator("order_type", mode="before")
+    @classmethod
+    def _check_order_type(cls, value):
+        order_type = value.upper() if isinstance(value, str) else value
+        if order_type not in ORDER_TYPES:
+            raise ValueError(f"must be 'LIMIT' or 'MARKET', got '{value}'")
+        return order_type
+
+    @model_validator(mode="after")
+    def _check_price(self):
+        if self.order_type == "MARKET":
+            # MARKET orders don't need price, set to 0
+            self.price = 0
+        elif self.price is None:
+            raise ValueError("Price is required for LIMIT orders")
+        elif self.price <= 0:
+            raise ValueError("Invalid price for LIMIT order: Price must be positive for LIMIT orders")
+        return self
+
+
 class OrderPlacedPayload(BaseModel):
     agent_id: str
     agent_name: str
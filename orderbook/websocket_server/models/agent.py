@@ -1,11 +1,20 @@
 """Agent data model."""
 
+import itertools
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
+import orjson
 
-@dataclass
+# Globally unique versions, so (agent_id, _version) never repeats across agents
+_versions = itertools.count(1)
+_UNSET = object()
+# Position keys are int instrument ids
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+@dataclass(slots=True)
 class Position:
     """Agent position in an instrument."""
     instrument_id: int
@@ -21,7 +30,7 @@ class Position:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Agent:
     """Represents a trading agent."""
     agent_id: str
@@ -33,20 +42,47 @@ class Agent:
     pnl: float = 0.0
     created_at: datetime = field(default_factory=datetime.now)
     starting_capital: float = 0.0
+    # Bumped whenever a public field actually changes; to_dict() is cached per version
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    _dict_cache: Optional[Tuple[int, dict]] = field(default=None, init=False, repr=False, compare=False)
+    _json_cache: Optional[Tuple[int, bytes]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name, value):
+        if name[0] != '_' and getattr(self, name, _UNSET) != value:
+            object.__setattr__(self, '_version', next(_versions))
+        object.__setattr__(self, name, value)
+    
+    @property
+    def version(self) -> int:
+        """Changes whenever the agent's serialized form would."""
+        return self._version
     
     def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
-        return {
-            'agent_id': self.agent_id,
-            'name': self.name,
-            'personality': self.personality,
-            'cash': self.cash,
-            'positions': {k: v.to_dict() for k, v in self.positions.items()},
-            'total_value': self.total_value,
-            'pnl': self.pnl,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'starting_capital': self.starting_capital
-        }
+        """Convert to dictionary for JSON serialization.
+        
+        The dict is cached until the agent changes; treat it as read-only.
+        """
+        cache = self._dict_cache
+        if cache is None or cache[0] != self._version:
+            cache = self._dict_cache = (self._version, {
+                'agent_id': self.agent_id,
+                'name': self.name,
+                'personality': self.personality,
+                'cash': self.cash,
+                'positions': {k: v.to_dict() for k, v in self.positions.items()},
+                'total_value': self.total_value,
+                'pnl': self.pnl,
+                'created_at': self.created_at.isoformat() if self.created_at else None,
+                'starting_capital': self.starting_capital
+            })
+        return cache[1]
+    
+    def to_json(self) -> bytes:
+        """Serialized ``to_dict()``, cached per version for splicing into list payloads."""
+        cache = self._json_cache
+        if cache is None or cache[0] != self._version:
+            cache = self._json_cache = (self._version, orjson.dumps(self.to_dict(), option=_JSON_OPTIONS))
+        return cache[1]
     
     def get_position(self, instrument_id: int) -> Optional[Position]:
         """Get position for an instrument."""
@@ -54,16 +90,16 @@ class Agent:
     
     def update_position(self, instrument_id: int, quantity: int, price: float):
         """Update position after a trade."""
-        if instrument_id in self.positions:
-            pos = self.positions[instrument_id]
-            total_cost = (pos.quantity * pos.avg_price) + (quantity * price)
-            total_qty = pos.quantity + quantity
-            if total_qty != 0:
-                pos.avg_price = total_cost / total_qty
-            pos.quantity = total_qty
-            if pos.quantity == 0:
-                del self.positions[instrument_id]
-        else:
-            if quantity != 0:
-                self.positions[instrument_id] = Position(instrument_id, quantity, price)
-
+        if quantity == 0:
+            return
+        self._version = next(_versions)
+        pos = self.positions.get(instrument_id)
+        if pos is None:
+            self.positions[instrument_id] = Position(instrument_id, quantity, price)
+            return
+        total_qty = pos.quantity + quantity
+        if total_qty == 0:
+            del self.positions[instrument_id]
+            return
+        pos.avg_price = (pos.quantity * pos.avg_price + quantity * price) / total_qty
+        pos.quantity = total_qty
@@ -1,10 +1,12 @@
 """Instrument data model."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
 
-@dataclass
+import orjson
+
+@dataclass(slots=True)
 class Instrument:
     """Represents a tradable instrument."""
     symbol_id: int
@@ -13,27 +15,51 @@ class Instrument:
     industry: str
     initial_price: float
     created_at: Optional[datetime] = None
+    # Serialized forms, built on first use and dropped whenever a field is reassigned
+    _dict_cache: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _json_cache: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if not name.startswith('_'):
+            object.__setattr__(self, '_dict_cache', None)
+            object.__setattr__(self, '_json_cache', None)
     
     def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
-        return {
-            'symbol_id': self.symbol_id,
-            'ticker': self.ticker,
-            'description': self.description,
-            'industry': self.industry,
-            'initial_price': self.initial_price,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        """Convert to dictionary for JSON serialization.
+        
+        The dict is cached and shared between callers; treat it as read-only.
+        """
+        if self._dict_cache is None:
+            self._dict_cache = {
+                'symbol_id': self.symbol_id,
+                'ticker': self.ticker,
+                'description': self.description,
+                'industry': self.industry,
+                'initial_price': self.initial_price,
+                'created_at': self.created_at.isoformat() if self.created_at else None
+            }
+        return self._dict_cache
+    
+    def to_json(self) -> bytes:
+        """Serialized ``to_dict()``, cached for splicing into broadcast frames."""
+        if self._json_cache is None:
+            self._json_cache = orjson.dumps(self.to_dict())
+        return self._json_cache
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Instrument':
         """Create from dictionary."""
+        created_at = data['created_at']
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except TypeError:  # already a datetime (or None)
+            pass
         return cls(
             symbol_id=data['symbol_id'],
             ticker=data['ticker'],
             description=data['description'],
             industry=data['industry'],
             initial_price=float(data.get('initial_price', 0.0)),
-            created_at=datetime.fromisoformat(data['created_at']) if isinstance(data['created_at'], str) else data['created_at']
+            created_at=created_at
         )
-
@@ -5,15 +5,21 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class News:
     """Represents a news item. News is independent of instruments - agents interpret which instruments are affected."""
     news_id: int
     content: str
-    published_at: datetime
+    # time.time_ns() at publication; converted to a datetime only when read
+    published_at_ns: int
     instrument_id: Optional[int] = None  # Optional: agents decide which instruments are affected
     impact_type: Optional[str] = None  # "positive", "negative", "neutral"
     
+    @property
+    def published_at(self) -> datetime:
+        """Publication time as a local datetime."""
+        return datetime.fromtimestamp(self.published_at_ns / 1e9)
+    
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
         return {
@@ -27,10 +33,15 @@ class News:
     @classmethod
     def from_dict(cls, data: dict) -> 'News':
         """Create from dictionary."""
+        published_at = data['published_at']
+        try:
+            published_at = datetime.fromisoformat(published_at)
+        except TypeError:  # already a datetime
+            pass
         return cls(
             news_id=data['news_id'],
             content=data['content'],
-            published_at=datetime.fromisoformat(data['published_at']) if isinstance(data['published_at'], str) else data['published_at'],
+            published_at_ns=int(published_at.timestamp() * 1e9),
             instrument_id=data.get('instrument_id'),
             impact_type=data.get('impact_type')
         )
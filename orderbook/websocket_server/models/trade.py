@@ -2,18 +2,27 @@
 
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Literal
 
+TradeSide = Literal["buy", "sell"]
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Trade:
     """Represents a trade execution."""
     trade_id: int
     agent_id: str
     instrument_id: int
-    side: str  # "buy" or "sell"
+    side: TradeSide
     price: float
     quantity: int
-    timestamp: datetime
+    # time.time_ns() at execution: recording a trade never builds a datetime
+    timestamp_ns: int
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Execution time as a local datetime."""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9)
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
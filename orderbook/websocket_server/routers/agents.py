@@ -1,18 +1,37 @@
 """Agent REST endpoints."""
 
 import uuid
-from fastapi import APIRouter, HTTPException, Request
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, Response
 
 from models.agent import Agent
 from state import agent_manager, portfolio_tracker
 
 router = APIRouter(prefix="/api/agents", tags=["Agents"])
 
+# (every agent's (agent_id, version), encoded leaderboard body)
+_leaderboard_cache: Optional[Tuple[tuple, bytes]] = None
+
 
 @router.get("")
 async def list_agents():
     agents = agent_manager.list_agents()
-    return [agent.to_dict() for agent in agents]
+    body = b"[%s]" % b",".join(agent.to_json() for agent in agents)
+    return Response(body, media_type="application/json")
+
+
+@router.get("/leaderboard")
+async def get_leaderboard():
+    global _leaderboard_cache
+    agents = agent_manager.list_agents()
+    # Re-sort only when some agent changed since the last request
+    key = tuple((agent.agent_id, agent.version) for agent in agents)
+    if _leaderboard_cache is None or _leaderboard_cache[0] != key:
+        sorted_agents = sorted(agents, key=lambda a: a.total_value, reverse=True)
+        body = b"[%s]" % b",".join(agent.to_json() for agent in sorted_agents)
+        _leaderboard_cache = (key, body)
+    return Response(_leaderboard_cache[1], media_type="application/json")
 
 
 @router.get("/{agent_id}")
@@ -42,13 +61,6 @@ async def get_trades(agent_id: str, limit: int | None = None):
     return [trade.to_dict() for trade in trades]
 
 
-@router.get("/leaderboard")
-async def get_leaderboard():
-    agents = agent_manager.list_agents()
-    sorted_agents = sorted(agents, key=lambda a: a.total_value, reverse=True)
-    return [agent.to_dict() for agent in sorted_agents]
-
-
 @router.post("")
 async def create_agent(request: Request):
     """Create a new agent (metadata only - agent must connect via WebSocket)"""
@@ -78,13 +90,12 @@ async def create_agent(request: Request):
     agent.total_value = starting_capital
     
     # Register in agent manager (agent will connect via WebSocket later)
-    agent_manager.agents[agent_id] = agent
+    agent_manager.add_pending_agent(agent)
     
     # Import here to avoid circular dependency
-    from broadcast import broadcast_agents_snapshot, broadcast_agent_created
-    await broadcast_agents_snapshot()
-    # Broadcast agent creation event for real-time agent spawning
-    await broadcast_agent_created(agent.to_dict())
+    from broadcast import broadcast_agents_delta
+    # One delta frame updates dashboards and lets agent runners spawn the agent
+    await broadcast_agents_delta(added=[agent.to_dict()])
     
     return agent.to_dict()
 
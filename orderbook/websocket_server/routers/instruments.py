@@ -1,6 +1,6 @@
 """Instrument REST endpoints."""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 
 from broadcast import broadcast_instruments_update
 from state import instrument_service, market_maker_service
@@ -11,7 +11,9 @@ router = APIRouter(prefix="/api/instruments", tags=["Instruments"])
 @router.get("")
 async def list_instruments():
     instruments = instrument_service.list_instruments()
-    return [inst.to_dict() for inst in instruments]
+    # Splice each instrument's cached JSON rather than re-encoding the list
+    body = b"[%s]" % b",".join(inst.to_json() for inst in instruments)
+    return Response(body, media_type="application/json")
 
 
 @router.post("")
@@ -34,7 +36,7 @@ async def add_instrument(data: dict):
     if initial_price <= 0:
         raise HTTPException(status_code=400, detail="initial_price must be positive")
 
-    instrument = instrument_service.add_instrument(
+    instrument = await instrument_service.add_instrument_async(
         ticker, description, industry, initial_price
     )
     if instrument:
@@ -46,7 +48,7 @@ async def add_instrument(data: dict):
 
 @router.delete("/{symbol_id}")
 async def remove_instrument(symbol_id: int):
-    success = instrument_service.remove_instrument(symbol_id)
+    success = await instrument_service.remove_instrument_async(symbol_id)
     if success:
         await market_maker_service.remove_instrument(symbol_id)
         await broadcast_instruments_update()
@@ -2,7 +2,6 @@
 
 from fastapi import APIRouter, HTTPException
 
-from broadcast import broadcast_news_update
 from state import news_service
 
 router = APIRouter(prefix="/api/news", tags=["News"])
@@ -19,8 +18,8 @@ async def publish_news(data: dict):
 
     instrument_id = int(instrument_id) if instrument_id else None
 
+    # Subscribers (the websocket broadcaster) are notified by publish_news itself
     news = news_service.publish_news(content, instrument_id, impact_type)
-    await broadcast_news_update(news.to_dict())
     return news.to_dict()
 
 
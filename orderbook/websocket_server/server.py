@@ -2,25 +2,39 @@
 """FastAPI application that bridges dashboards/agents with the C++ order book."""
 
 import asyncio
-import json
+import functools
 import logging
 import time
 import uuid
-from collections import deque
-from datetime import datetime
+from array import array
+from bisect import bisect_right
 from typing import Dict
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
+import orjson
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
 import uvicorn
 
 from broadcast import (
+    MSGPACK_SUBPROTOCOL,
+    TCPSocketMiddleware,
     broadcast_agents_snapshot,
     broadcast_instruments_update,
+    broadcast_news,
     broadcast_order_event,
     broadcast_orderbook_snapshots,
+    close_channel,
+    encode_orderbooks,
+    encode_portfolio_update,
+    instruments_frame,
+    iso_timestamp,
+    news_history_frame,
+    reply,
+    start_snapshot_broadcaster,
 )
-from message_models import OrderPlacedMessage, OrderPlacedPayload
+from message_models import AddOrderRequest
 from routers import agents as agents_router
 from routers import instruments as instruments_router
 from routers import news as news_router
@@ -30,6 +44,7 @@ from state import (
     agent_manager,
     instrument_service,
     market_maker_service,
+    msgpack_connections,
     news_service,
     portfolio_tracker,
     regular_connections,
@@ -41,13 +56,80 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def _dumps(payload: dict) -> str:
+    """Serialize a reply frame with orjson (int symbol_id keys and numpy scalars allowed)."""
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+# Replies that never vary by connection, encoded once
+_PONG_FRAME = _dumps({"type": "pong"})
+_INVALID_JSON_FRAME = _dumps({"type": "error", "message": "Invalid JSON format"})
+
+
+@functools.lru_cache(maxsize=256)
+def _order_error_frame(message: str) -> str:
+    """order_response error frame; rejections repeat the same few messages, so frames are cached."""
+    return _dumps({"type": "order_response", "data": {"status": "error", "message": message}})
+
+# How order_response names each AddOrderRequest field in validation errors
+_ORDER_FIELD_LABELS = {"orderType": "order type", "price": "price for LIMIT order"}
+
+
+def _order_error(exc: ValidationError) -> str:
+    """Render the first add_order validation error as an order_response message."""
+    error = exc.errors(include_url=False)[0]
+    message = str(error["ctx"]["error"]) if error["type"] == "value_error" else error["msg"]
+    if not error["loc"]:
+        return message
+    field = error["loc"][0]
+    return f"Invalid {_ORDER_FIELD_LABELS.get(field, field)}: {message}"
+
+
+class _RateWindow:
+    """Ring buffer of the most recent event times, counted by bisection.
+    
+    Times come from ``time.monotonic_ns`` and are written in order, so the buffer
+    is two sorted runs split at ``head`` and a window count needs two binary
+    searches instead of a scan.
+    """
+
+    __slots__ = ("times", "head", "size", "capacity")
+
+    def __init__(self, capacity: int = 1000):
+        # Unboxed int64 storage: one contiguous block, no object per recorded event
+        self.times = array("q", [0]) * capacity
+        self.head = 0
+        self.size = 0
+        self.capacity = capacity
+
+    def record(self, now: int):
+        # Called once per order/trade: a compare-and-reset wrap is cheaper than % and len()
+        head = self.head
+        self.times[head] = now
+        head += 1
+        if head == self.capacity:
+            head = 0
+        self.head = head
+        if self.size < self.capacity:
+            self.size += 1
+
+    def count_since(self, cutoff: int) -> int:
+        times, head, size = self.times, self.head, self.size
+        if size < len(times):
+            return size - bisect_right(times, cutoff, 0, size)
+        # Full: the older run is times[head:], the newer one times[:head]
+        older = len(times) - bisect_right(times, cutoff, head)
+        return older + head - bisect_right(times, cutoff, 0, head)
+
+
 # Performance metrics tracking
 class PerformanceMetrics:
     """Track orderbook performance metrics."""
     
     def __init__(self):
-        self.trade_timestamps = deque(maxlen=1000)  # Last 1000 trades
-        self.order_timestamps = deque(maxlen=1000)  # Last 1000 orders
+        self.trade_times = _RateWindow()  # Last 1000 trades
+        self.order_times = _RateWindow()  # Last 1000 orders
         self.queue_full_count = 0
         self.total_orders = 0
         self.total_trades = 0
@@ -55,20 +137,20 @@ class PerformanceMetrics:
         self.start_time = time.time()
         # SPSC queue capacity (from constants.hpp)
         self.queue_capacity = 1024  # DEFAULT_QUEUE_SIZE
+        # (monotonic second, stats) so polling dashboards share one computation per second
+        self._stats_cache = (-1, {})
         
     def record_order(self, quantity: float = 0):
-        """Record an order submission."""
-        self.order_timestamps.append(time.time())
+        """Record an order submission (quantity is validated positive by the caller)."""
+        self.order_times.record(time.monotonic_ns())
         self.total_orders += 1
-        if quantity > 0:
-            self.total_volume += quantity
+        self.total_volume += quantity
             
     def record_trade(self, quantity: float = 0):
-        """Record a trade execution."""
-        self.trade_timestamps.append(time.time())
+        """Record a trade execution (quantity is validated positive by the caller)."""
+        self.trade_times.record(time.monotonic_ns())
         self.total_trades += 1
-        if quantity > 0:
-            self.total_volume += quantity
+        self.total_volume += quantity
             
     def record_queue_full(self):
         """Record when queue is full."""
@@ -76,26 +158,21 @@ class PerformanceMetrics:
         
     def get_trades_per_second(self, window_seconds: float = 1.0) -> float:
         """Calculate trades per second over a time window."""
-        if not self.trade_timestamps:
-            return 0.0
-        now = time.time()
-        cutoff = now - window_seconds
-        recent_trades = sum(1 for ts in self.trade_timestamps if ts > cutoff)
-        return recent_trades / window_seconds
+        cutoff = time.monotonic_ns() - int(window_seconds * 1_000_000_000)
+        return self.trade_times.count_since(cutoff) / window_seconds
         
     def get_orders_per_second(self, window_seconds: float = 1.0) -> float:
         """Calculate orders per second over a time window."""
-        if not self.order_timestamps:
-            return 0.0
-        now = time.time()
-        cutoff = now - window_seconds
-        recent_orders = sum(1 for ts in self.order_timestamps if ts > cutoff)
-        return recent_orders / window_seconds
+        cutoff = time.monotonic_ns() - int(window_seconds * 1_000_000_000)
+        return self.order_times.count_since(cutoff) / window_seconds
         
     def get_stats(self) -> Dict:
-        """Get current performance statistics."""
+        """Get current performance statistics, recomputed at most once a second."""
+        second = int(time.monotonic())
+        if self._stats_cache[0] == second:
+            return self._stats_cache[1]
         uptime = time.time() - self.start_time
-        return {
+        stats = {
             "trades_per_second": round(self.get_trades_per_second(), 2),
             "orders_per_second": round(self.get_orders_per_second(), 2),
             "total_trades": self.total_trades,
@@ -108,11 +185,13 @@ class PerformanceMetrics:
             "avg_trades_per_second": round(self.total_trades / max(1, uptime), 2),
             "avg_orders_per_second": round(self.total_orders / max(1, uptime), 2),
         }
+        self._stats_cache = (second, stats)
+        return stats
 
 # Global performance metrics instance
 performance_metrics = PerformanceMetrics()
 
-app = FastAPI(title="Trading Simulation Server")
+app = FastAPI(title="Trading Simulation Server", default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -120,6 +199,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it wraps outermost and sees uvicorn's own send callable
+app.add_middleware(TCPSocketMiddleware)
 app.include_router(instruments_router.router)
 app.include_router(agents_router.router)
 app.include_router(news_router.router)
@@ -145,7 +226,7 @@ async def startup_event():
             "No instruments detected on startup. Adding default instrument %s",
             DEFAULT_INSTRUMENT.ticker,
         )
-        default_inst = instrument_service.add_instrument(
+        default_inst = await instrument_service.add_instrument_async(
             DEFAULT_INSTRUMENT.ticker,
             DEFAULT_INSTRUMENT.description,
             DEFAULT_INSTRUMENT.industry,
@@ -160,886 +241,229 @@ async def startup_event():
             )
 
     market_maker_service.set_book_update_callback(broadcast_orderbook_snapshots)
+    news_service.subscribe(broadcast_news)
+    start_snapshot_broadcaster()
     asyncio.create_task(periodic_sync())
     asyncio.create_task(market_maker_service.bootstrap(instruments))
 
 
-async def _send_initial_payloads(websocket: WebSocket):
-    instruments = instrument_service.list_instruments()
-    await websocket.send_text(
-        json.dumps({"type": "instruments", "data": [inst.to_dict() for inst in instruments]})
-    )
-
-    orderbook_snapshots = {}
-    for instrument in instruments:
-        snapshot = instrument_service.client.get_snapshot(instrument.symbol_id)
-        if snapshot.get("status") == "success":
-            orderbook_snapshots[instrument.symbol_id] = snapshot
-    if orderbook_snapshots:
-        await websocket.send_text(json.dumps({"type": "orderbooks", "data": orderbook_snapshots}))
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled backend connections instead of leaving them to process exit."""
+    instrument_service.client.close()
 
-    all_news = news_service.get_news()
-    if all_news:
-        await websocket.send_text(
-            json.dumps({"type": "news_history", "data": [news.to_dict() for news in all_news]})
-        )
-
-
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for dashboards and agents."""
-    await websocket.accept()
-    regular_connections.add(websocket)
-    logger.info("Client connected. Total connections: %s", len(regular_connections))
 
-    try:
-        await _send_initial_payloads(websocket)
-        await broadcast_agents_snapshot()
-
-        while True:
-            data = await websocket.receive_text()
-            try:
-                message = json.loads(data)
-            except json.JSONDecodeError as e:
-                logger.warning(f"Invalid JSON from client: {e}, data: {data[:200]}")
-                await websocket.send_text(json.dumps({
-                    "type": "error",
-                    "message": "Invalid JSON format"
-                }))
-                continue
-
-            # Handle ping/pong heartbeat messages
-            if message.get("type") == "ping":
-                await websocket.send_text(json.dumps({
-                    "type": "pong"
-                }))
-                continue
-
-            if message.get("type") != "agent_register" and message.get("type") not in [
-                "add_order", "cancel_order", "get_portfolio", "agent_register"
-            ]:
-                logger.warning(f"Unknown message type: {message.get('type')}")
-                await websocket.send_text(json.dumps({
-                    "type": "error",
-                    "message": f"Unknown message type: {message.get('type')}"
-                }))
-                continue
-
-            if message["type"] == "agent_register":
-                regular_connections.discard(websocket)
-                agent_id = message.get("agent_id", str(uuid.uuid4()))
-                name = message.get("name", f"Agent_{agent_id[:8]}")
-                personality = message.get("personality", "neutral")
-                starting_capital = message.get("starting_capital", 100000.0)
-
-                agent = agent_manager.register_agent(
-                    agent_id, name, personality, starting_capital, websocket
-                )
-
-                await websocket.send_text(
-                    json.dumps(
-                        {
-                            "type": "agent_registered",
-                            "agent_id": agent_id,
-                            "agent": agent.to_dict(),
-                        }
-                    )
-                )
-                await _send_initial_payloads(websocket)
-                await broadcast_agents_snapshot()
-                continue
-
-            if message["type"] == "add_order":
-                symbol_id = message.get("symbol_id", 1)
-                side = message.get("side", "").upper()
-                order_type = message.get("orderType", "LIMIT").upper()
-                
-                # Validate side
-                if side not in ("BUY", "SELL"):
-                    await websocket.send_text(json.dumps({
-                        "type": "order_response",
-                        "data": {"status": "error", "message": f"Invalid side: must be 'buy' or 'sell', got '{message.get('side')}'"}
-                    }))
-                    continue
-                
-                # Validate order type
-                if order_type not in ("LIMIT", "MARKET"):
-                    await websocket.send_text(json.dumps({
-                        "type": "order_response",
-                        "data": {"status": "error", "message": f"Invalid order type: must be 'LIMIT' or 'MARKET', got '{message.get('orderType')}'"}
-                    }))
-                    continue
-                
-                # Validate quantity
-                quantity = message.get("quantity")
-                try:
-                    quantity = float(quantity)
-                    if quantity <= 0 or not isinstance(quantity, (int, float)):
-                        raise ValueError("Quantity must be a positive number")
-                except (TypeError, ValueError) as e:
-                    await websocket.send_text(json.dumps({
-                        "type": "order_response",
-                        "data": {"status": "error", "message": f"Invalid quantity: {e}"}
-                    }))
-                    continue
-                
-                # Validate price for LIMIT orders
-                price = message.get("price")
-                if order_type == "LIMIT":
-                    if price is None:
-                        await websocket.send_text(json.dumps({
-                            "type": "order_response",
-                            "data": {"status": "error", "message": "Price is required for LIMIT orders"}
-                        }))
-                        continue
-                    try:
-                        price = float(price)
-                        if price <= 0:
-                            raise ValueError("Price must be positive for LIMIT orders")
-                    except (TypeError, ValueError) as e:
-                        await websocket.send_text(json.dumps({
-                            "type": "order_response",
-                            "data": {"status": "error", "message": f"Invalid price for LIMIT order: {e}"}
-                        }))
-                        continue
-                else:
-                    # MARKET orders don't need price, set to 0
-                    price = 0
-                
-                agent_id = message.get("agent_id")
-
-                result = instrument_service.client.add_order(
-                    symbol_id, side, order_type, price, quantity
-                )
-                # Track performance metrics
-                if result.get("status") == "success":
-                    performance_metrics.record_order(quantity)
-                elif "QUEUE_FULL" in str(result.get("message", "")):
-                    performance_metrics.record_queue_full()
+async def _send_initial_payloads(websocket: WebSocket):
+    await reply(websocket, instruments_frame().decode())
 
-                if result["status"] == "success" and agent_id:
-                    agent = agent_manager.get_agent(agent_id)
-                    instrument = instrument_service.get_instrument(symbol_id)
-                    if agent:
-                        try:
-                            portfolio_tracker.record_trade(
-                                agent_id, symbol_id, side.lower(), price, int(quantity)
-                            )
-                            # Track trade in performance metrics
-                            performance_metrics.record_trade(quantity)
-                            await broadcast_agents_snapshot()
-                        except (ValueError, TypeError, KeyError) as exc:
-                            logger.error("Error recording trade: %s", exc)
-                        except Exception as exc:  # pragma: no cover
-                            logger.exception("Unexpected error recording trade: %s", exc)
+    # Share the broadcaster's encoded books; fetch only if an instrument is not in them yet
+    symbol_ids = instrument_service.symbol_ids()
+    frame = encode_orderbooks(symbol_ids)
+    if frame is not None:
+        await reply(websocket, frame.decode())
+    else:
+        snapshots = await instrument_service.client.get_snapshots_async(symbol_ids)
+        orderbook_snapshots = {
+            symbol_id: snapshot
+            for symbol_id, snapshot in snapshots.items()
+            if snapshot.get("status") == "success"
+        }
+        if orderbook_snapshots:
+            await reply(websocket, _dumps({"type": "orderbooks", "data": orderbook_snapshots}))
 
-                    order_message = OrderPlacedMessage(
-                        data=OrderPlacedPayload(
-                            agent_id=agent_id,
-                            agent_name=agent.name if agent else "Unknown",
-                            symbol_id=symbol_id,
-                            ticker=instrument.ticker if instrument else f"SYM{symbol_id}",
-                            side=side,
-                            order_type=order_type,
-                            price=price,
-                            quantity=quantity,
-                            timestamp=datetime.now().isoformat(),
-                        )
-                    )
-                    await broadcast_order_event(order_message)
+    frame = news_history_frame()
+    if frame is not None:
+        await reply(websocket, frame.decode())
 
-                await broadcast_orderbook_snapshots([symbol_id])
-                await websocket.send_text(
-                    json.dumps({"type": "order_response", "data": result})
-                )
-                continue
 
-            if message["type"] == "cancel_order":
-                symbol_id = message.get("symbol_id", 1)
-                order_id = message["orderId"]
-                result = instrument_service.client.cancel_order(symbol_id, order_id)
-                await websocket.send_text(
-                    json.dumps({"type": "cancel_response", "data": result})
-                )
-                if result.get("status") == "success":
-                    await broadcast_orderbook_snapshots([symbol_id])
-                continue
+async def _handle_agent_register(websocket: WebSocket, message: dict):
+    """Register the socket as an agent and send it the initial state."""
+    regular_connections.discard(websocket)
+    agent_id = message.get("agent_id", str(uuid.uuid4()))
+    name = message.get("name", f"Agent_{agent_id[:8]}")
+    personality = message.get("personality", "neutral")
+    starting_capital = message.get("starting_capital", 100000.0)
 
-            if message["type"] == "get_portfolio":
-                agent_id = message.get("agent_id")
-                if agent_id:
-                    agent = agent_manager.get_agent(agent_id)
-                    if agent:
-                        await websocket.send_text(
-                            json.dumps(
-                                {
-                                    "type": "portfolio_update",
-                                    "cash": agent.cash,
-                                    "positions": {
-                                        k: v.to_dict() for k, v in agent.positions.items()
-                                    },
-                                    "total_value": agent.total_value,
-                                    "pnl": agent.pnl,
-                                }
-                            )
-                        )
-                continue
+    agent = agent_manager.register_agent(
+        agent_id, name, personality, starting_capital, websocket
+    )
 
-    except WebSocketDisconnect:
-        regular_connections.discard(websocket)
-        agent_manager.unregister_websocket(websocket)
-        logger.info(
-            "Client disconnected. Total connections: %s", len(regular_connections)
+    await reply(
+        websocket,
+        _dumps(
+            {
+                "type": "agent_registered",
+                "agent_id": agent_id,
+                "agent": agent.to_dict(),
+            }
         )
-        await broadcast_agents_snapshot()
-    except Exception as exc:  # pragma: no cover
-        logger.exception("WebSocket error: %s", exc)
-        regular_connections.discard(websocket)
-        agent_manager.unregister_websocket(websocket)
-        await broadcast_agents_snapshot()
-
-
-@app.get("/health")
-async def health_check():
-    return {
-        "status": "ok",
-        "connections": len(regular_connections),
-        "agents": len(agent_manager.get_all_agent_ids()),
-        "instruments": len(instrument_service.list_instruments()),
-    }
-
-
-if __name__ == "__main__":  # pragma: no cover
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
-
-# C++ backend connection settings
-CPP_HOST = "localhost"
-CPP_PORT = 9999
-
-# Global orderbook client
-ob_client = OrderBookClient(CPP_HOST, CPP_PORT)
-
-# Default bootstrap instrument (ensures dashboard/agents have something to trade)
-DEFAULT_BOOTSTRAP_INSTRUMENT = {
-    "ticker": os.getenv("DEFAULT_INSTRUMENT_TICKER", "AAPL"),
-    "description": os.getenv("DEFAULT_INSTRUMENT_DESC", "Apple Inc."),
-    "industry": os.getenv("DEFAULT_INSTRUMENT_INDUSTRY", "Technology"),
-    "initial_price": float(os.getenv("DEFAULT_INSTRUMENT_PRICE", "150.0"))
-}
-
-# Services
-instrument_service = InstrumentService(ob_client)
-agent_manager = AgentManager()
-portfolio_tracker = PortfolioTracker(agent_manager)
-news_service = NewsService()
-market_maker_service = MarketMakerService(ob_client)
-
-# Regular WebSocket clients (non-agent)
-regular_connections: Set[WebSocket] = set()
+    )
+    await _send_initial_payloads(websocket)
+    await broadcast_agents_snapshot()
 
 
-async def broadcast_to_regular_clients(payload: Dict[str, Any]):
-    """Broadcast a payload to all dashboard clients."""
-    if not regular_connections:
+async def _handle_add_order(websocket: WebSocket, message: dict):
+    """Validate and submit an order, then broadcast its effects."""
+    try:
+        order = AddOrderRequest.model_validate(message)
+    except ValidationError as exc:
+        await reply(websocket, _order_error_frame(_order_error(exc)))
         return
-    
-    message = json.dumps(payload)
-    disconnected: Set[WebSocket] = set()
-    
-    for connection in list(regular_connections):
-        try:
-            await connection.send_text(message)
-        except Exception:
-            disconnected.add(connection)
-    
-    regular_connections.difference_update(disconnected)
-
-
-async def broadcast_to_agents(payload: Dict[str, Any]):
-    """Broadcast a payload to all connected agents."""
-    message = json.dumps(payload)
-    
-    for agent_id in agent_manager.get_all_agent_ids():
-        ws = agent_manager.get_websocket(agent_id)
-        if ws:
+    symbol_id = order.symbol_id
+    side = order.side
+    order_type = order.order_type
+    quantity = order.quantity
+    price = order.price
+    agent_id = order.agent_id
+
+    result = await instrument_service.client.add_order_async(
+        symbol_id, side, order_type, price, quantity
+    )
+    # Track performance metrics
+    if result.get("status") == "success":
+        performance_metrics.record_order(quantity)
+    elif "QUEUE_FULL" in str(result.get("message", "")):
+        performance_metrics.record_queue_full()
+
+    if result["status"] == "success" and agent_id:
+        agent = agent_manager.get_agent(agent_id)
+        if agent:
             try:
-                await ws.send_text(message)
-            except Exception:
-                pass
-
-
-async def broadcast_instruments_update():
-    """Broadcast refreshed instrument list and orderbook snapshots to dashboards and agents."""
-    instruments = instrument_service.list_instruments()
-    
-    # Send instruments list
-    payload = {
-        "type": "instruments",
-        "data": [inst.to_dict() for inst in instruments]
-    }
-    await broadcast_to_regular_clients(payload)
-    await broadcast_to_agents(payload)
-    
-    # Also push snapshots so everyone has immediate book state
-    await broadcast_orderbook_snapshots([inst.symbol_id for inst in instruments])
-
-
-async def broadcast_orderbook_snapshots(symbol_ids: Optional[List[int]] = None):
-    """Broadcast snapshots for specific instruments (or all if None)."""
-    target_ids: List[int]
-    if symbol_ids:
-        target_ids = list({int(sid) for sid in symbol_ids})
+                portfolio_tracker.record_trade(
+                    agent_id, symbol_id, side.lower(), price, int(quantity)
+                )
+                # Track trade in performance metrics
+                performance_metrics.record_trade(quantity)
+                await broadcast_agents_snapshot()
+            except (ValueError, TypeError, KeyError) as exc:
+                logger.error("Error recording trade: %s", exc)
+            except Exception as exc:  # pragma: no cover
+                logger.exception("Unexpected error recording trade: %s", exc)
+
+        await broadcast_order_event({
+            "agent_id": agent_id,
+            "agent_name": agent.name if agent else "Unknown",
+            "symbol_id": symbol_id,
+            "ticker": instrument_service.get_ticker(symbol_id),
+            "side": side,
+            "order_type": order_type,
+            "price": float(price),
+            "quantity": int(quantity),
+            "timestamp": iso_timestamp(),
+        })
+
+    if result["status"] == "success":
+        await broadcast_orderbook_snapshots([symbol_id])
+        await reply(websocket, _dumps({"type": "order_response", "data": result}))
     else:
-        target_ids = [inst.symbol_id for inst in instrument_service.list_instruments()]
-    
-    if not target_ids:
-        return
-    
-    snapshots: Dict[int, Any] = {}
-    for symbol_id in target_ids:
-        snapshot = ob_client.get_snapshot(symbol_id)
-        if snapshot.get("status") == "success":
-            snapshots[symbol_id] = snapshot
-    
-    if snapshots:
-        payload = {
-            "type": "orderbooks",
-            "data": snapshots
-        }
-        await broadcast_to_regular_clients(payload)
-        await broadcast_to_agents(payload)
+        await reply(websocket, _order_error_frame(result["message"]))
 
 
-async def broadcast_news_update(news: News):
-    """Broadcast a single news item to dashboards and agents."""
-    payload = {
-        "type": "news",
-        "data": news.to_dict()
-    }
-    await broadcast_to_regular_clients(payload)
-    await broadcast_to_agents(payload)
+async def _handle_cancel_order(websocket: WebSocket, message: dict):
+    """Cancel an order and refresh its book."""
+    symbol_id = message.get("symbol_id", 1)
+    order_id = message["orderId"]
+    result = await instrument_service.client.cancel_order_async(symbol_id, order_id)
+    await reply(websocket, _dumps({"type": "cancel_response", "data": result}))
+    if result.get("status") == "success":
+        await broadcast_orderbook_snapshots([symbol_id])
 
 
-async def broadcast_agents_snapshot():
-    """Broadcast the latest agent stats to dashboards."""
-    agents = agent_manager.list_agents()
-    payload = {
-        "type": "agents_snapshot",
-        "data": [agent.to_dict() for agent in agents]
-    }
-    await broadcast_to_regular_clients(payload)
+async def _handle_get_portfolio(websocket: WebSocket, message: dict):
+    """Reply with an agent's portfolio."""
+    agent_id = message.get("agent_id")
+    if agent_id:
+        agent = agent_manager.get_agent(agent_id)
+        if agent:
+            await reply(websocket, encode_portfolio_update(agent))
 
-# Let market maker push updates whenever it refreshes liquidity
-market_maker_service.set_book_update_callback(broadcast_orderbook_snapshots)
-async def broadcast_orderbooks():
-    """Fallback periodic broadcast to resync any missed clients."""
-    BROADCAST_INTERVAL = float(os.getenv("BROADCAST_INTERVAL", "5.0"))  # Slow fallback sync
-    
-    while True:
-        try:
-            await asyncio.sleep(BROADCAST_INTERVAL)
-            
-            instruments = instrument_service.list_instruments()
-            if not instruments:
-                continue
-            
-            # Get snapshots for all instruments
-            snapshots = {}
-            current_prices = {}
-            
-            for instrument in instruments:
-                snapshot = ob_client.get_snapshot(instrument.symbol_id)
-                if snapshot["status"] == "success":
-                    snapshots[instrument.symbol_id] = snapshot
-                    # Calculate mid-price for portfolio valuation
-                    bids = snapshot.get("bids", [])
-                    asks = snapshot.get("asks", [])
-                    if bids and asks:
-                        mid_price = (bids[0]["price"] + asks[0]["price"]) / 2
-                        current_prices[instrument.symbol_id] = mid_price
-                    elif bids:
-                        current_prices[instrument.symbol_id] = bids[0]["price"]
-                    elif asks:
-                        current_prices[instrument.symbol_id] = asks[0]["price"]
-            
-            # Update portfolio values and broadcast agent stats
-            portfolio_tracker.update_portfolio_values(current_prices)
-            await broadcast_agents_snapshot()
-            
-            # Broadcast to regular clients
-            message = json.dumps({
-                "type": "orderbooks",
-                "data": snapshots
-            })
-            
-            disconnected = set()
-            for connection in regular_connections:
-                try:
-                    await connection.send_text(message)
-                except:
-                    disconnected.add(connection)
-            regular_connections.difference_update(disconnected)
-            
-            # Broadcast to agents with portfolio updates
-            for agent_id in agent_manager.get_all_agent_ids():
-                agent = agent_manager.get_agent(agent_id)
-                ws = agent_manager.get_websocket(agent_id)
-                if agent and ws:
-                    try:
-                        # Send orderbooks
-                        await ws.send_text(message)
-                        
-                        # Send portfolio update
-                        portfolio_msg = json.dumps({
-                            "type": "portfolio_update",
-                            "cash": agent.cash,
-                            "positions": {k: v.to_dict() for k, v in agent.positions.items()},
-                            "total_value": agent.total_value,
-                            "pnl": agent.pnl
-                        })
-                        await ws.send_text(portfolio_msg)
-                    except:
-                        pass
-            
-        except Exception as e:
-            logger.error(f"Broadcast error: {e}")
 
+async def _handle_ping(websocket: WebSocket, message: dict):
+    """Answer a heartbeat."""
+    await reply(websocket, _PONG_FRAME)
 
-@app.on_event("startup")
-async def startup_event():
-    """Start background tasks"""
-    instruments = instrument_service.list_instruments()
-    
-    if not instruments:
-        logger.info(
-            "No instruments detected on startup. Adding default instrument %s",
-            DEFAULT_BOOTSTRAP_INSTRUMENT["ticker"]
-        )
-        default_inst = instrument_service.add_instrument(
-            DEFAULT_BOOTSTRAP_INSTRUMENT["ticker"],
-            DEFAULT_BOOTSTRAP_INSTRUMENT["description"],
-            DEFAULT_BOOTSTRAP_INSTRUMENT["industry"],
-            DEFAULT_BOOTSTRAP_INSTRUMENT["initial_price"],
-        )
-        if default_inst:
-            instruments = instrument_service.list_instruments()
-            await broadcast_instruments_update()
-        else:
-            logger.error("Failed to create default instrument; system will remain without instruments.")
-    
-    asyncio.create_task(broadcast_orderbooks())
-    asyncio.create_task(market_maker_service.bootstrap(instruments))
+
+# Inbound message type -> handler, resolved with a single lookup per frame
+_MESSAGE_HANDLERS = {
+    "ping": _handle_ping,
+    "agent_register": _handle_agent_register,
+    "add_order": _handle_add_order,
+    "cancel_order": _handle_cancel_order,
+    "get_portfolio": _handle_get_portfolio,
+}
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for clients and agents"""
-    await websocket.accept()
+    """WebSocket endpoint for dashboards and agents."""
+    if MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", ()):
+        await websocket.accept(subprotocol=MSGPACK_SUBPROTOCOL)
+        msgpack_connections.add(websocket)
+    else:
+        await websocket.accept()
     regular_connections.add(websocket)
-    logger.info(f"Client connected. Total connections: {len(regular_connections)}")
-    
-    try:
-        # Send initial data on connection
-        instruments = instrument_service.list_instruments()
-        
-        # 1. Send instruments list
-        await websocket.send_text(json.dumps({
-            "type": "instruments",
-            "data": [inst.to_dict() for inst in instruments]
-        }))
-        
-        # 2. Send current orderbook snapshots for all instruments
-        orderbook_snapshots = {}
-        for instrument in instruments:
-            snapshot = ob_client.get_snapshot(instrument.symbol_id)
-            if snapshot["status"] == "success":
-                orderbook_snapshots[instrument.symbol_id] = snapshot
-        
-        if orderbook_snapshots:
-            await websocket.send_text(json.dumps({
-                "type": "orderbooks",
-                "data": orderbook_snapshots
-            }))
-        
-        # 3. Send all news items (but not activity log)
-        all_news = news_service.get_news()  # Get all news, no limit
-        if all_news:
-            await websocket.send_text(json.dumps({
-                "type": "news_history",
-                "data": [news.to_dict() for news in all_news]
-            }))
+    logger.info("Client connected. Total connections: %s", len(regular_connections))
 
-        # Push agent snapshot so new dashboards have state
+    try:
+        await _send_initial_payloads(websocket)
         await broadcast_agents_snapshot()
-        
-        # Listen for client messages
+
         while True:
             data = await websocket.receive_text()
             try:
-                message = json.loads(data)
-            except json.JSONDecodeError as e:
-                logger.warning(f"Invalid JSON from client: {e}, data: {data[:200]}")
-                await websocket.send_text(json.dumps({
-                    "type": "error",
-                    "message": "Invalid JSON format"
-                }))
+                message = orjson.loads(data)
+            except orjson.JSONDecodeError as e:
+                logger.warning("Invalid JSON from client: %s, data: %.200s", e, data)
+                await reply(websocket, _INVALID_JSON_FRAME)
                 continue
-            
-            if message.get("type") not in ["agent_register", "add_order", "cancel_order", "get_portfolio"]:
-                logger.warning(f"Unknown message type: {message.get('type')}")
-                await websocket.send_text(json.dumps({
+
+            message_type = message.get("type")
+            handler = _MESSAGE_HANDLERS.get(message_type)
+            if handler is None:
+                logger.warning("Unknown message type: %s", message_type)
+                await reply(websocket, _dumps({
                     "type": "error",
-                    "message": f"Unknown message type: {message.get('type')}"
+                    "message": f"Unknown message type: {message_type}"
                 }))
                 continue
-            
-            if message["type"] == "agent_register":
-                # Agent registration
-                regular_connections.discard(websocket)
-                agent_id = message.get("agent_id", str(uuid.uuid4()))
-                name = message.get("name", f"Agent_{agent_id[:8]}")
-                personality = message.get("personality", "neutral")
-                starting_capital = message.get("starting_capital", 100000.0)
-                
-                agent = agent_manager.register_agent(agent_id, name, personality, starting_capital, websocket)
-                
-                await websocket.send_text(json.dumps({
-                    "type": "agent_registered",
-                    "agent_id": agent_id,
-                    "agent": agent.to_dict()
-                }))
-                await broadcast_agents_snapshot()
-                
-                # Send current instruments
-                await websocket.send_text(json.dumps({
-                    "type": "instruments",
-                    "data": [inst.to_dict() for inst in instruments]
-                }))
-                
-                # Send current orderbook snapshots for all instruments (agents need this!)
-                orderbook_snapshots = {}
-                for instrument in instruments:
-                    snapshot = ob_client.get_snapshot(instrument.symbol_id)
-                    if snapshot["status"] == "success":
-                        orderbook_snapshots[instrument.symbol_id] = snapshot
-                
-                if orderbook_snapshots:
-                    await websocket.send_text(json.dumps({
-                        "type": "orderbooks",
-                        "data": orderbook_snapshots
-                    }))
-                    logger.debug(f"Sent initial orderbook snapshots to agent {name} ({len(orderbook_snapshots)} instruments)")
-                
-                # Send news history
-                all_news = news_service.get_news()
-                if all_news:
-                    await websocket.send_text(json.dumps({
-                        "type": "news_history",
-                        "data": [news.to_dict() for news in all_news]
-                    }))
-            
-            elif message["type"] == "add_order":
-                # Place order with validation
-                symbol_id = message.get("symbol_id", 1)
-                side = message.get("side", "").upper()
-                order_type = message.get("orderType", "LIMIT").upper()
-                
-                # Validate side
-                if side not in ("BUY", "SELL"):
-                    await websocket.send_text(json.dumps({
-                        "type": "order_response",
-                        "data": {"status": "error", "message": f"Invalid side: must be 'buy' or 'sell', got '{message.get('side')}'"}
-                    }))
-                    continue
-                
-                # Validate order type
-                if order_type not in ("LIMIT", "MARKET"):
-                    await websocket.send_text(json.dumps({
-                        "type": "order_response",
-                        "data": {"status": "error", "message": f"Invalid order type: must be 'LIMIT' or 'MARKET', got '{message.get('orderType')}'"}
-                    }))
-                    continue
-                
-                # Validate quantity
-                quantity = message.get("quantity")
-                try:
-                    quantity = float(quantity)
-                    if quantity <= 0 or not isinstance(quantity, (int, float)):
-                        raise ValueError("Quantity must be a positive number")
-                except (TypeError, ValueError) as e:
-                    await websocket.send_text(json.dumps({
-                        "type": "order_response",
-                        "data": {"status": "error", "message": f"Invalid quantity: {e}"}
-                    }))
-                    continue
-                
-                # Validate price for LIMIT orders - THIS IS THE KEY FIX FOR PRICE 0 ISSUE
-                price = message.get("price")
-                if order_type == "LIMIT":
-                    if price is None:
-                        await websocket.send_text(json.dumps({
-                            "type": "order_response",
-                            "data": {"status": "error", "message": "Price is required for LIMIT orders"}
-                        }))
-                        continue
-                    try:
-                        price = float(price)
-                        if price <= 0:
-                            raise ValueError("Price must be positive for LIMIT orders")
-                    except (TypeError, ValueError) as e:
-                        await websocket.send_text(json.dumps({
-                            "type": "order_response",
-                            "data": {"status": "error", "message": f"Invalid price for LIMIT order: {e}"}
-                        }))
-                        continue
-                else:
-                    # MARKET orders don't need price, set to 0
-                    price = 0
-                
-                agent_id = message.get("agent_id")
-                
-                result = ob_client.add_order(symbol_id, side, order_type, price, quantity)
-                # Track performance metrics
-                if result.get("status") == "success":
-                    performance_metrics.record_order(quantity)
-                elif "QUEUE_FULL" in str(result.get("message", "")):
-                    performance_metrics.record_queue_full()
-                
-                if result["status"] == "success" and agent_id:
-                    # Record trade if agent is placing order
-                    agent = agent_manager.get_agent(agent_id)
-                    instrument = instrument_service.get_instrument(symbol_id)
-                    if agent:
-                        # Note: In real system, we'd wait for trade execution event
-                        # For now, we'll record it as a trade
-                        try:
-                            trade = portfolio_tracker.record_trade(
-                                agent_id, symbol_id, side.lower(), price, int(quantity)
-                            )
-                            # Track trade in performance metrics
-                            performance_metrics.record_trade(quantity)
-                            await broadcast_agents_snapshot()
-                        except (ValueError, TypeError, KeyError) as e:
-                            logger.error(f"Error recording trade: {e}")
-                        except Exception as e:
-                            logger.exception(f"Unexpected error recording trade: {e}")
-                    
-                    # Broadcast order event to all regular clients (dashboard)
-                    order_event = json.dumps({
-                        "type": "order_placed",
-                        "data": {
-                            "agent_id": agent_id,
-                            "agent_name": agent.name if agent else "Unknown",
-                            "symbol_id": symbol_id,
-                            "ticker": instrument.ticker if instrument else f"SYM{symbol_id}",
-                            "side": side,
-                            "order_type": order_type,
-                            "price": price,
-                            "quantity": quantity,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    })
-                    
-                    disconnected_clients = set()
-                    for connection in regular_connections:
-                        try:
-                            await connection.send_text(order_event)
-                        except:
-                            disconnected_clients.add(connection)
-                    regular_connections.difference_update(disconnected_clients)
-                
-                # Push fresh orderbook snapshot so dashboards/agents update in real-time
-                await broadcast_orderbook_snapshots([symbol_id])
-                
-                await websocket.send_text(json.dumps({
-                    "type": "order_response",
-                    "data": result
-                }))
-            
-            elif message["type"] == "cancel_order":
-                symbol_id = message.get("symbol_id", 1)
-                order_id = message["orderId"]
-                result = ob_client.cancel_order(symbol_id, order_id)
-                await websocket.send_text(json.dumps({
-                    "type": "cancel_response",
-                    "data": result
-                }))
-                
-                if result.get("status") == "success":
-                    await broadcast_orderbook_snapshots([symbol_id])
-            
-            elif message["type"] == "get_portfolio":
-                agent_id = message.get("agent_id")
-                if agent_id:
-                    agent = agent_manager.get_agent(agent_id)
-                    if agent:
-                        await websocket.send_text(json.dumps({
-                            "type": "portfolio_update",
-                            "cash": agent.cash,
-                            "positions": {k: v.to_dict() for k, v in agent.positions.items()},
-                            "total_value": agent.total_value,
-                            "pnl": agent.pnl
-                        }))
-            
+            await handler(websocket, message)
+
     except WebSocketDisconnect:
         regular_connections.discard(websocket)
         agent_manager.unregister_websocket(websocket)
-        logger.info(f"Client disconnected. Total connections: {len(regular_connections)}")
+        close_channel(websocket)
+        logger.info(
+            "Client disconnected. Total connections: %s", len(regular_connections)
+        )
         await broadcast_agents_snapshot()
-    except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+    except Exception as exc:  # pragma: no cover
+        logger.exception("WebSocket error: %s", exc)
         regular_connections.discard(websocket)
         agent_manager.unregister_websocket(websocket)
+        close_channel(websocket)
         await broadcast_agents_snapshot()
 
 
-# REST API Endpoints
-
-@app.get("/api/instruments")
-async def list_instruments():
-    """List all instruments"""
-    instruments = instrument_service.list_instruments()
-    return [inst.to_dict() for inst in instruments]
-
-
-@app.post("/api/instruments")
-async def add_instrument(request: Request):
-    """Add a new instrument"""
-    data = await request.json()
-    ticker = data.get("ticker")
-    description = data.get("description", "")
-    industry = data.get("industry", "")
-    initial_price = data.get("initial_price")
-    
-    if not ticker:
-        raise HTTPException(status_code=400, detail="Ticker is required")
-    if initial_price is None:
-        raise HTTPException(status_code=400, detail="initial_price is required")
-    
-    try:
-        initial_price = float(initial_price)
-    except (TypeError, ValueError):
-        raise HTTPException(status_code=400, detail="initial_price must be numeric")
-    
-    if initial_price <= 0:
-        raise HTTPException(status_code=400, detail="initial_price must be positive")
-    
-    instrument = instrument_service.add_instrument(ticker, description, industry, initial_price)
-    if instrument:
-        await market_maker_service.ensure_instrument(instrument)
-        await broadcast_instruments_update()
-        return instrument.to_dict()
-    raise HTTPException(status_code=500, detail="Failed to add instrument")
-
-
-@app.delete("/api/instruments/{symbol_id}")
-async def remove_instrument(symbol_id: int):
-    """Remove an instrument"""
-    success = instrument_service.remove_instrument(symbol_id)
-    if success:
-        await market_maker_service.remove_instrument(symbol_id)
-        await broadcast_instruments_update()
-        return {"status": "success"}
-    raise HTTPException(status_code=404, detail="Instrument not found")
-
-
-@app.get("/api/agents")
-async def list_agents():
-    """List all agents with stats"""
-    agents = agent_manager.list_agents()
-    return [agent.to_dict() for agent in agents]
-
-
-@app.get("/api/agents/{agent_id}")
-async def get_agent(agent_id: str):
-    """Get agent details"""
-    agent = agent_manager.get_agent(agent_id)
-    if agent:
-        return agent.to_dict()
-    raise HTTPException(status_code=404, detail="Agent not found")
-
-
-@app.get("/api/agents/{agent_id}/portfolio")
-async def get_agent_portfolio(agent_id: str):
-    """Get agent portfolio"""
-    agent = agent_manager.get_agent(agent_id)
-    if agent:
-        return {
-            "cash": agent.cash,
-            "positions": {k: v.to_dict() for k, v in agent.positions.items()},
-            "total_value": agent.total_value,
-            "pnl": agent.pnl
-        }
-    raise HTTPException(status_code=404, detail="Agent not found")
-
-
-@app.get("/api/agents/{agent_id}/trades")
-async def get_agent_trades(agent_id: str, limit: Optional[int] = None):
-    """Get agent trade history"""
-    trades = portfolio_tracker.get_trades(agent_id, limit)
-    return [trade.to_dict() for trade in trades]
-
-
-@app.post("/api/news")
-async def publish_news(request: Request):
-    """Publish news. News is independent of instruments - agents interpret which instruments are affected."""
-    data = await request.json()
-    instrument_id = data.get("instrument_id")  # Optional
-    content = data.get("content")
-    impact_type = data.get("impact_type")
-    
-    if not content:
-        raise HTTPException(status_code=400, detail="content is required")
-    
-    # Convert instrument_id to int if provided, None otherwise
-    instrument_id = int(instrument_id) if instrument_id else None
-    
-    news = news_service.publish_news(content, instrument_id, impact_type)
-    
-    # Broadcast news to agents and dashboards
-    await broadcast_news_update(news)
-    
-    return news.to_dict()
-
-
-@app.get("/api/news")
-async def get_news(limit: Optional[int] = None):
-    """Get news history"""
-    news_items = news_service.get_news(limit)
-    return [news.to_dict() for news in news_items]
-
-
-@app.get("/api/leaderboard")
-async def get_leaderboard():
-    """Get leaderboard sorted by total asset value"""
-    agents = agent_manager.list_agents()
-    sorted_agents = sorted(agents, key=lambda a: a.total_value, reverse=True)
-    return [agent.to_dict() for agent in sorted_agents]
-
-
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
     return {
         "status": "ok",
         "connections": len(regular_connections),
-        "agents": len(agent_manager.get_all_agent_ids()),
+        "agents": len(agent_manager.agents),
         "instruments": len(instrument_service.list_instruments()),
-        "backend": f"{CPP_HOST}:{CPP_PORT}"
     }
 
 
-# Performance endpoint moved to router - keeping for backward compatibility if needed
-# @app.get("/api/performance")
-# async def get_performance_metrics():
-#     """Get orderbook performance metrics."""
-#     return performance_metrics.get_stats()
-
-
-if __name__ == "__main__":
-    logger.info("Starting OrderBook WebSocket Server...")
-    logger.info(f"Backend: {CPP_HOST}:{CPP_PORT}")
-    logger.info("WebSocket Server: ws://localhost:8000/ws")
-    logger.info("REST API: http://localhost:8000/api")
-    
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+if __name__ == "__main__":  # pragma: no cover
+    # uvloop/httptools ship with uvicorn[standard]; startup tasks are created on the loop uvicorn builds.
+    # Clients sit on the internal network, where deflating every fan-out frame only costs CPU.
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        ws_per_message_deflate=False,
+    )
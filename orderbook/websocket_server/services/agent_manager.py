@@ -1,6 +1,7 @@
 """Service for managing agent connections and metadata."""
 
-from typing import Dict, Optional, Set
+from typing import Dict, Optional, Set, Tuple
+from weakref import WeakKeyDictionary
 from fastapi import WebSocket
 
 from models.agent import Agent
@@ -12,7 +13,12 @@ class AgentManager:
     def __init__(self):
         self.agents: Dict[str, Agent] = {}
         self.connections: Dict[str, WebSocket] = {}
-        self.agent_ids_by_ws: Dict[WebSocket, str] = {}
+        # Weak so a socket dropped without a clean unregister does not linger here
+        self.agent_ids_by_ws: WeakKeyDictionary[WebSocket, str] = WeakKeyDictionary()
+        # Agents known from metadata only, still waiting for their WebSocket
+        self._pending: Set[str] = set()
+        # Connected agent sockets for broadcast fan-out, rebuilt only on (un)registration
+        self._websockets: Tuple[WebSocket, ...] = ()
     
     def register_agent(self, agent_id: str, name: str, personality: str, 
                       starting_capital: float, websocket: WebSocket) -> Agent:
@@ -27,8 +33,10 @@ class AgentManager:
         agent.total_value = starting_capital
         
         self.agents[agent_id] = agent
+        self._pending.discard(agent_id)
         self.connections[agent_id] = websocket
         self.agent_ids_by_ws[websocket] = agent_id
+        self._websockets = tuple(self.connections.values())
         
         return agent
     
@@ -38,7 +46,15 @@ class AgentManager:
             ws = self.connections[agent_id]
             self.agent_ids_by_ws.pop(ws, None)
             del self.connections[agent_id]
+            self._websockets = tuple(self.connections.values())
         self.agents.pop(agent_id, None)
+        self._pending.discard(agent_id)
+    
+    def add_pending_agent(self, agent: Agent):
+        """Add agent metadata ahead of its WebSocket registration."""
+        self.agents[agent.agent_id] = agent
+        if agent.agent_id not in self.connections:
+            self._pending.add(agent.agent_id)
     
     def unregister_websocket(self, websocket: WebSocket):
         """Unregister agent by WebSocket."""
@@ -61,6 +77,10 @@ class AgentManager:
         """Get WebSocket for an agent."""
         return self.connections.get(agent_id)
     
+    def get_websockets(self) -> Tuple[WebSocket, ...]:
+        """Get every connected agent's WebSocket (a shared snapshot; do not mutate)."""
+        return self._websockets
+    
     def list_agents(self) -> list[Agent]:
         """List all agents."""
         return list(self.agents.values())
@@ -71,11 +91,7 @@ class AgentManager:
     
     def get_pending_agents(self) -> list[Agent]:
         """Get agents that don't have active WebSocket connections."""
-        pending = []
-        for agent_id, agent in self.agents.items():
-            if agent_id not in self.connections:
-                pending.append(agent)
-        return pending
+        return [self.agents[agent_id] for agent_id in self._pending]
     
     def has_connection(self, agent_id: str) -> bool:
         """Check if an agent has an active WebSocket connection."""
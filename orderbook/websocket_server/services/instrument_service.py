@@ -1,10 +1,21 @@
 """Service for managing instruments."""
 
-from typing import Dict, List, Optional
+import functools
+import re
+from typing import Dict, List, Optional, Tuple
 
 from models.instrument import Instrument
 from .orderbook_client import OrderBookClient
 
+# One LIST_INSTRUMENTS row: id|ticker|description|industry[|initial_price[|...]]
+_INSTRUMENT_LINE = re.compile(r"^(\d+)\|([^|\n]*)\|([^|\n]*)\|([^|\n]*)(?:\|([^|\n]*))?.*$", re.M)
+
+
+@functools.lru_cache(maxsize=1024)
+def _placeholder_ticker(symbol_id: int) -> str:
+    """Display ticker for a symbol that is not (or no longer) registered."""
+    return f"SYM{symbol_id}"
+
 
 class InstrumentService:
     """Manages instrument registry and communication with C++ backend."""
@@ -12,6 +23,10 @@ class InstrumentService:
     def __init__(self, client: Optional[OrderBookClient] = None, cpp_host: str = "localhost", cpp_port: int = 9999):
         self.client = client or OrderBookClient(cpp_host, cpp_port)
         self.instruments: Dict[int, Instrument] = {}
+        # Bumped whenever the registry changes, so callers can cache derived frames
+        self.version = 0
+        self._synced = False
+        self._symbol_ids: Tuple[int, Tuple[int, ...]] = (-1, ())
     
     def _send_command(self, command: str) -> str:
         """Send command to C++ backend and get response."""
@@ -19,15 +34,29 @@ class InstrumentService:
     
     def add_instrument(self, ticker: str, description: str, industry: str, initial_price: float) -> Optional[Instrument]:
         """Add a new instrument."""
+        cmd = self._add_instrument_command(ticker, description, industry, initial_price)
+        response = self._send_command(cmd)
+        return self._register_instrument(response, ticker, description, industry, initial_price)
+    
+    async def add_instrument_async(self, ticker: str, description: str, industry: str,
+                                   initial_price: float) -> Optional[Instrument]:
+        """Add a new instrument without blocking the event loop."""
+        cmd = self._add_instrument_command(ticker, description, industry, initial_price)
+        response = await self.client.send_command_async(cmd)
+        return self._register_instrument(response, ticker, description, industry, initial_price)
+    
+    @staticmethod
+    def _add_instrument_command(ticker: str, description: str, industry: str, initial_price: float) -> str:
         # Escape pipe characters in fields
         ticker_escaped = ticker.replace('|', '_')
         desc_escaped = description.replace('|', '_')
         industry_escaped = industry.replace('|', '_')
         price_str = f"{initial_price:.2f}"
         
-        cmd = f"ADD_INSTRUMENT {ticker_escaped}|{desc_escaped}|{industry_escaped}|{price_str}"
-        response = self._send_command(cmd)
-        
+        return f"ADD_INSTRUMENT {ticker_escaped}|{desc_escaped}|{industry_escaped}|{price_str}"
+    
+    def _register_instrument(self, response: str, ticker: str, description: str, industry: str,
+                             initial_price: float) -> Optional[Instrument]:
         if response.startswith("OK"):
             parts = response.strip().split()
             symbol_id = int(parts[1])
@@ -41,66 +70,85 @@ class InstrumentService:
                 created_at=None  # Will be set by C++ backend
             )
             self.instruments[symbol_id] = instrument
+            self.version += 1
             return instrument
         return None
     
     def remove_instrument(self, symbol_id: int) -> bool:
         """Remove an instrument."""
-        cmd = f"REMOVE_INSTRUMENT {symbol_id}"
-        response = self._send_command(cmd)
-        
+        response = self._send_command(f"REMOVE_INSTRUMENT {symbol_id}")
+        return self._unregister_instrument(response, symbol_id)
+    
+    async def remove_instrument_async(self, symbol_id: int) -> bool:
+        """Remove an instrument without blocking the event loop."""
+        response = await self.client.send_command_async(f"REMOVE_INSTRUMENT {symbol_id}")
+        return self._unregister_instrument(response, symbol_id)
+    
+    def _unregister_instrument(self, response: str, symbol_id: int) -> bool:
         if response.startswith("OK"):
-            self.instruments.pop(symbol_id, None)
+            if self.instruments.pop(symbol_id, None) is not None:
+                self.version += 1
             return True
         return False
     
     def list_instruments(self) -> List[Instrument]:
-        """List all instruments."""
+        """List all instruments.
+        
+        The backend registry only changes through this service, so it is read
+        once and then kept current by add/remove.
+        """
+        if self._synced:
+            return list(self.instruments.values())
         cmd = "LIST_INSTRUMENTS"
         response = self._send_command(cmd)
         
-        instruments = []
+        if not response.startswith("INSTRUMENTS"):
+            return list(self.instruments.values())
         try:
-            lines = response.strip().split('\n')
-            if not lines or not lines[0].startswith("INSTRUMENTS"):
-                return list(self.instruments.values())
-            
-            # Parse response
-            for line in lines[1:]:
-                if line == "END":
-                    break
-                parts = line.split('|')
-                if len(parts) >= 4:
-                    symbol_id = int(parts[0])
-                    ticker = parts[1]
-                    description = parts[2]
-                    industry = parts[3]
+            for match in _INSTRUMENT_LINE.finditer(response):
+                symbol_id, ticker, description, industry, price = match.groups()
+                symbol_id = int(symbol_id)
+                try:
+                    initial_price = float(price) if price else 0.0
+                except ValueError:
                     initial_price = 0.0
-                    if len(parts) >= 5:
-                        try:
-                            initial_price = float(parts[4])
-                        except ValueError:
-                            initial_price = 0.0
-                    
-                    instrument = Instrument(
-                        symbol_id=symbol_id,
-                        ticker=ticker,
-                        description=description,
-                        industry=industry,
-                        initial_price=initial_price,
-                        created_at=None
-                    )
-                    self.instruments[symbol_id] = instrument
-                    instruments.append(instrument)
+                
+                # Keep the existing object (and its cached JSON) when nothing changed
+                current = self.instruments.get(symbol_id)
+                if current is not None and (current.ticker, current.description, current.industry,
+                                            current.initial_price) == (ticker, description, industry, initial_price):
+                    continue
+                self.instruments[symbol_id] = Instrument(
+                    symbol_id=symbol_id,
+                    ticker=ticker,
+                    description=description,
+                    industry=industry,
+                    initial_price=initial_price,
+                    created_at=None
+                )
+                self.version += 1
+            self._synced = True
         except Exception as e:
             print(f"Error parsing instruments: {e}")
         
         return list(self.instruments.values())
     
+    def symbol_ids(self) -> Tuple[int, ...]:
+        """Registered symbol IDs, cached until the registry changes."""
+        self.list_instruments()
+        if self._symbol_ids[0] != self.version:
+            self._symbol_ids = (self.version, tuple(self.instruments))
+        return self._symbol_ids[1]
+    
     def get_instrument(self, symbol_id: int) -> Optional[Instrument]:
         """Get instrument by symbol ID."""
         return self.instruments.get(symbol_id)
     
+    def get_ticker(self, symbol_id: int) -> str:
+        """Ticker for a symbol ID, or a SYM<id> placeholder if it is unknown."""
+        instrument = self.instruments.get(symbol_id)
+        return instrument.ticker if instrument is not None else _placeholder_ticker(symbol_id)
+    
     def has_instrument(self, symbol_id: int) -> bool:
         """Check if instrument exists."""
         return symbol_id in self.instruments
@@ -5,7 +5,7 @@ import logging
 import os
 import random
 import time
-from typing import Dict, List, Optional, Callable, Awaitable
+from typing import Dict, List, Optional, Callable, Awaitable, Set
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +29,9 @@ class MarketMakerService:
         self._active_orders: Dict[int, Dict[str, List[int]]] = {}
         self._last_pulse: Dict[int, float] = {}
         self._on_book_update = on_book_update
+        # Refreshed symbols are reported together by one flush task instead of per loop
+        self._pending_updates: Set[int] = set()
+        self._flush_task: Optional[asyncio.Task] = None
     
     def set_book_update_callback(self, callback: Optional[Callable[[List[int]], Awaitable[None]]]):
         """Register async callback to notify when liquidity updates."""
@@ -66,13 +69,15 @@ class MarketMakerService:
         price_hint = max(reference_price, 1.0)
         try:
             while True:
-                snapshot = self.ob_client.get_snapshot(symbol_id)
-                mid = self._get_mid_price(symbol_id)
-                
-                # Check if orderbook is empty or has low liquidity
-                bids = snapshot.get("bids", []) if snapshot.get("status") == "success" else []
-                asks = snapshot.get("asks", []) if snapshot.get("status") == "success" else []
-                has_liquidity = len(bids) > 0 and len(asks) > 0
+                # One fetch per tick feeds both the liquidity check and the mid
+                snapshot = await self.ob_client.get_snapshot_async(symbol_id)
+                if snapshot.get("status") == "success":
+                    bids = snapshot.get("bids", [])
+                    asks = snapshot.get("asks", [])
+                else:
+                    bids = asks = []
+                has_liquidity = bool(bids) and bool(asks)
+                mid = self._get_mid_price(bids, asks)
                 
                 if mid is None:
                     mid = price_hint * (1 + random.uniform(-self.volatility, self.volatility))
@@ -84,17 +89,36 @@ class MarketMakerService:
                 if not has_liquidity:
                     # Use faster refresh when no liquidity
                     await self._refresh_orders(symbol_id, price_hint, pulse=True, aggressive=True)
-                    if self._on_book_update:
-                        await self._on_book_update([symbol_id])
+                    self._mark_updated(symbol_id)
                     await asyncio.sleep(self.refresh_interval * 0.5)  # 2x faster when no liquidity
                 else:
                     await self._refresh_orders(symbol_id, price_hint, pulse)
-                    if self._on_book_update:
-                        await self._on_book_update([symbol_id])
+                    self._mark_updated(symbol_id)
                     await asyncio.sleep(self.refresh_interval)
         except asyncio.CancelledError:
             await self._cancel_orders(symbol_id)
     
+    def _mark_updated(self, symbol_id: int):
+        """Queue a book-update notification for the next flush."""
+        if not self._on_book_update:
+            return
+        self._pending_updates.add(symbol_id)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_updates())
+    
+    async def _flush_updates(self):
+        """Report every symbol refreshed since the last flush in one callback."""
+        while True:
+            await asyncio.sleep(self.refresh_interval / 4)
+            if not self._pending_updates or not self._on_book_update:
+                continue
+            symbol_ids = list(self._pending_updates)
+            self._pending_updates.clear()
+            try:
+                await self._on_book_update(symbol_ids)
+            except Exception as exc:  # pragma: no cover - keep the flush loop alive
+                logger.exception("Market maker book update callback failed: %s", exc)
+    
     def _should_pulse(self, symbol_id: int) -> bool:
         last = self._last_pulse.get(symbol_id, 0)
         now = time.time()
@@ -127,30 +151,27 @@ class MarketMakerService:
             levels = self.levels
             label = "normal"
         
+        quotes = []
         for level in range(1, levels + 1):
             offset = spread + (level - 1) * self.tick_size
             bid_price = max(1.0, mid_price - offset)
             ask_price = max(bid_price + self.tick_size, mid_price + offset)
-            
-            bid_order = self.ob_client.add_order(symbol_id, "BUY", "LIMIT", bid_price, qty)
-            if bid_order.get("status") == "success":
-                order_id = int(bid_order.get("orderId", 0))
-                bids.append(order_id)
-                logger.debug("Market maker [%s] placed BUY order: %d @ %.2f qty=%d (%s)", 
-                            symbol_id, order_id, bid_price, qty, label)
-            else:
-                logger.warning("Market maker [%s] failed to place BUY order @ %.2f: %s", 
-                             symbol_id, bid_price, bid_order.get("message", "unknown error"))
-            
-            ask_order = self.ob_client.add_order(symbol_id, "SELL", "LIMIT", ask_price, qty)
-            if ask_order.get("status") == "success":
-                order_id = int(ask_order.get("orderId", 0))
-                asks.append(order_id)
-                logger.debug("Market maker [%s] placed SELL order: %d @ %.2f qty=%d (%s)", 
-                            symbol_id, order_id, ask_price, qty, label)
+            quotes.append(("BUY", bid_price))
+            quotes.append(("SELL", ask_price))
+        
+        # Place every level in one BATCH request instead of 2*levels round trips
+        results = await self.ob_client.add_orders_async(
+            symbol_id, [(side, "LIMIT", price, qty) for side, price in quotes]
+        )
+        for (side, price), order in zip(quotes, results):
+            if order.get("status") == "success":
+                order_id = int(order.get("orderId", 0))
+                (bids if side == "BUY" else asks).append(order_id)
+                logger.debug("Market maker [%s] placed %s order: %d @ %.2f qty=%d (%s)", 
+                            symbol_id, side, order_id, price, qty, label)
             else:
-                logger.warning("Market maker [%s] failed to place SELL order @ %.2f: %s", 
-                             symbol_id, ask_price, ask_order.get("message", "unknown error"))
+                logger.warning("Market maker [%s] failed to place %s order @ %.2f: %s", 
+                             symbol_id, side, price, order.get("message", "unknown error"))
         
         self._active_orders[symbol_id] = {"buy": bids, "sell": asks}
         
@@ -166,19 +187,14 @@ class MarketMakerService:
         orders = self._active_orders.get(symbol_id)
         if not orders:
             return
-        for order_id in orders.get("buy", []):
-            self.ob_client.cancel_order(symbol_id, order_id)
-        for order_id in orders.get("sell", []):
-            self.ob_client.cancel_order(symbol_id, order_id)
+        order_ids = [*orders.get("buy", []), *orders.get("sell", [])]
+        if order_ids:
+            await self.ob_client.cancel_orders_async(symbol_id, order_ids)
         self._active_orders[symbol_id] = {"buy": [], "sell": []}
     
-    def _get_mid_price(self, symbol_id: int) -> Optional[float]:
-        """Pull latest snapshot and compute mid price."""
-        snapshot = self.ob_client.get_snapshot(symbol_id)
-        if snapshot.get("status") != "success":
-            return None
-        bids = snapshot.get("bids", [])
-        asks = snapshot.get("asks", [])
+    @staticmethod
+    def _get_mid_price(bids: list, asks: list) -> Optional[float]:
+        """Compute the mid price from a snapshot's best levels (one-sided books use the best price)."""
         if bids and asks:
             return (bids[0]["price"] + asks[0]["price"]) / 2
         if bids:
@@ -186,4 +202,3 @@ class MarketMakerService:
         if asks:
             return float(asks[0]["price"])
         return None
-
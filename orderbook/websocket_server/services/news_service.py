@@ -1,17 +1,39 @@
 """Service for managing and broadcasting news."""
 
-from typing import List, Optional
-from datetime import datetime
+import heapq
+from collections import deque
+from itertools import islice
+from operator import attrgetter
+import time
+from typing import Callable, Deque, Dict, List, Optional
 
 from models.news import News
 
+# Oldest items are evicted beyond this, so long sessions keep bounded memory
+MAX_NEWS_ITEMS = 10_000
+_NEWS_ORDER = attrgetter("news_id")
+
 
 class NewsService:
     """Manages news items and broadcasts them to agents."""
     
     def __init__(self):
-        self.news_items: List[News] = []
+        self.news_items: Deque[News] = deque()
+        # instrument_id (None for general news) -> its items, oldest first
+        self._by_instrument: Dict[Optional[int], Deque[News]] = {}
         self.next_news_id = 1
+        # Called synchronously with each published item, so news is pushed rather than polled
+        self._subscribers: List[Callable[[News], None]] = []
+    
+    def subscribe(self, callback: Callable[[News], None]):
+        """Register a callback for every news item published from now on."""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback: Callable[[News], None]):
+        """Stop notifying a callback registered with ``subscribe``."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
     
     def publish_news(self, content: str, 
                     instrument_id: Optional[int] = None,
@@ -20,31 +42,45 @@ class NewsService:
         news = News(
             news_id=self.next_news_id,
             content=content,
-            published_at=datetime.now(),
+            published_at_ns=time.time_ns(),
             instrument_id=instrument_id,
             impact_type=impact_type
         )
         self.next_news_id += 1
+        if len(self.news_items) >= MAX_NEWS_ITEMS:
+            # The globally oldest item is also the oldest of its instrument's bucket
+            oldest = self.news_items.popleft()
+            bucket = self._by_instrument[oldest.instrument_id]
+            bucket.popleft()
+            if not bucket:
+                del self._by_instrument[oldest.instrument_id]
         self.news_items.append(news)
+        self._by_instrument.setdefault(instrument_id, deque()).append(news)
+        for callback in tuple(self._subscribers):
+            callback(news)
         return news
     
     def get_news(self, limit: Optional[int] = None) -> List[News]:
-        """Get recent news items."""
-        news = self.news_items.copy()
+        """Get recent news items; without ``limit``, a snapshot list of all of them."""
         if limit:
-            return news[-limit:]
-        return news
+            return self.get_latest_news(limit)
+        return list(self.news_items)
     
     def get_news_by_instrument(self, instrument_id: int, 
                                limit: Optional[int] = None) -> List[News]:
         """Get news that may be related to a specific instrument (includes general news)."""
         # Return news that is either tagged with this instrument or is general (no instrument_id)
-        news = [n for n in self.news_items if n.instrument_id is None or n.instrument_id == instrument_id]
-        if limit:
-            return news[-limit:]
+        general = self._by_instrument.get(None, ())
+        tagged = self._by_instrument.get(instrument_id, ()) if instrument_id is not None else ()
+        # Walk both buckets newest-first so only ``limit`` items are touched
+        newest = heapq.merge(reversed(general), reversed(tagged), key=_NEWS_ORDER, reverse=True)
+        news = list(islice(newest, limit or None))
+        news.reverse()
         return news
     
     def get_latest_news(self, count: int = 10) -> List[News]:
         """Get latest news items."""
-        return self.news_items[-count:] if len(self.news_items) > count else self.news_items
+        news = list(islice(reversed(self.news_items), count))
+        news.reverse()
+        return news
 
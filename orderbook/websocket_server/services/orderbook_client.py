@@ -1,21 +1,146 @@
 """Reusable TCP client for communicating with the C++ orderbook.
 
 Supports connection pooling for improved performance and resource management.
+Every connection starts with a FRAMED request, after which the backend sends
+each reply behind a 4-byte big-endian length, so replies are read exactly
+rather than scanned for terminators.
 """
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import os
+import random
 import socket
+import struct
 import threading
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 from collections import deque
 
+# One pooled connection per core, never fewer than the historical default of 5
+DEFAULT_MAX_CONNECTIONS = max(5, os.cpu_count() or 1)
+# Sent once per connection: the backend then prefixes every reply with its length
+FRAMED_COMMAND = b"FRAMED\n"
+FRAMED_ACK = b"OK FRAMED\n"
+_FRAME_HEADER = struct.Struct(">I")
+# The backend reads a request in one 4 KiB recv; keep each BATCH well under that
+BATCH_MAX_COMMANDS = 64
+SOCKET_BUFFER_SIZE = 256 * 1024
+# Kernel keepalive for pooled sockets: probe after 15s idle, every 5s, give up after 3
+KEEPALIVE_IDLE = 15
+KEEPALIVE_INTERVAL = 5
+KEEPALIVE_COUNT = 3
+# Longest pause between retries, before jitter
+RETRY_BACKOFF_CAP = 1.0
+# Failures a fresh connection can cure; anything else is returned without retrying
+_RETRYABLE_ERRORS = (socket.timeout, ConnectionError)
+
+
+@functools.lru_cache(maxsize=1024)
+def _encode_command(command: str) -> bytes:
+    """Wire form of a command; polling commands such as SNAPSHOT repeat constantly."""
+    return command.encode() + b"\n"
+
+
+def _wire(command: Union[str, bytes]) -> bytes:
+    """Wire form of a command; ADD commands are built as bytes, newline included."""
+    return command if command.__class__ is bytes else _encode_command(command)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    """Read exactly ``size`` bytes into one preallocated buffer.
+    
+    The buffer is returned as is (callers only decode or compare it), so a
+    reply is copied once, out of the kernel, and never re-concatenated.
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    while view:
+        received = sock.recv_into(view)
+        if not received:
+            raise ConnectionError("Backend closed connection")
+        view = view[received:]
+    return buffer
+
+
+def _recv_frame(sock: socket.socket) -> bytearray:
+    """Read one length-prefixed reply."""
+    (size,) = _FRAME_HEADER.unpack(_recv_exact(sock, _FRAME_HEADER.size))
+    return _recv_exact(sock, size)
+
+
+async def _read_frame_async(reader: asyncio.StreamReader) -> bytes:
+    """Read one length-prefixed reply from an asyncio stream."""
+    (size,) = _FRAME_HEADER.unpack(await reader.readexactly(_FRAME_HEADER.size))
+    return await reader.readexactly(size)
+
+
+def _close_streams(streams: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]):
+    """Close an asyncio connection, if one was opened."""
+    if streams is not None:
+        streams[1].close()
+
+
+def _parse_levels(lines: List[str], idx: int, header: str) -> Tuple[List[Dict[str, Any]], int]:
+    """Parse the ``<header> <count>`` block at ``lines[idx]`` into levels; returns them and the next index.
+    
+    Raises ValueError/IndexError only for a malformed header.
+    """
+    if idx >= len(lines) or not lines[idx].startswith(header):
+        return [], idx
+    count = int(lines[idx].split()[1])
+    rows = lines[idx + 1:idx + 1 + count]
+    try:
+        # Well-formed rows (the norm) are converted in one comprehension
+        levels = [
+            {"price": float(price), "quantity": float(quantity), "orders": int(orders)}
+            for price, quantity, orders in map(str.split, rows)
+        ]
+    except ValueError:
+        # Slow path: skip malformed rows one by one
+        levels = []
+        for row in rows:
+            parts = row.split()
+            if len(parts) >= 3:
+                try:
+                    levels.append({"price": float(parts[0]), "quantity": float(parts[1]), "orders": int(parts[2])})
+                except ValueError:
+                    pass
+    return levels, idx + 1 + count
+
+
+def _negotiate_framing(sock: socket.socket):
+    """Switch a freshly connected socket to length-prefixed replies."""
+    sock.sendall(FRAMED_COMMAND)
+    if _recv_frame(sock) != FRAMED_ACK:
+        raise ConnectionError("Backend does not support framed replies")
+
+
+def _tune_socket(sock: socket.socket):
+    """Disable Nagle for small request/response frames, widen the kernel buffers and enable keepalive."""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # The timing knobs are Linux names (macOS has TCP_KEEPALIVE instead); keep OS defaults elsewhere
+    for option, value in (("TCP_KEEPIDLE", KEEPALIVE_IDLE), ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+                          ("TCP_KEEPCNT", KEEPALIVE_COUNT)):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
 
 class ConnectionPool:
-    """Thread-safe connection pool for TCP connections."""
+    """Thread-safe connection pool for TCP connections.
+    
+    Lock-free: idle sockets sit in a deque whose ``append``/``popleft`` are
+    atomic, and a semaphore holds one permit per borrowed socket. A socket is
+    only created when none is idle, so at most ``max_connections`` exist, and
+    a caller on a full pool can wait for the next return instead of polling.
+    """
     
-    def __init__(self, host: str, port: int, max_connections: int = 5, 
+    def __init__(self, host: str, port: int, max_connections: int = DEFAULT_MAX_CONNECTIONS, 
                  connection_timeout: float = 5.0, idle_timeout: float = 30.0):
         self.host = host
         self.port = port
@@ -23,82 +148,70 @@ class ConnectionPool:
         self.connection_timeout = connection_timeout
         self.idle_timeout = idle_timeout
         self._pool: deque = deque()
-        self._lock = threading.Lock()
-        self._active_connections = 0
+        # One permit per borrowed socket
+        self._slots = threading.Semaphore(max_connections)
     
-    def _create_connection(self) -> Optional[socket.socket]:
-        """Create a new TCP connection."""
+    def _create_connection(self) -> socket.socket:
+        """Create a new TCP connection; connection errors propagate to the caller."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            _tune_socket(sock)
             sock.settimeout(self.connection_timeout)
             sock.connect((self.host, self.port))
-            return sock
-        except Exception:
-            return None
+            _negotiate_framing(sock)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+    
+    @staticmethod
+    def _discard(sock: socket.socket):
+        """Close an idle socket."""
+        try:
+            sock.close()
+        except OSError:
+            pass
     
-    def get_connection(self) -> Optional[socket.socket]:
-        """Get a connection from the pool or create a new one."""
-        with self._lock:
-            # Try to get from pool
-            while self._pool:
+    def get_connection(self, timeout: float = 0.0) -> Optional[socket.socket]:
+        """Get a connection from the pool or create a new one.
+        
+        Waits up to ``timeout`` seconds for a socket to be returned when all
+        are borrowed, then gives ``None``. Failing to connect raises.
+        """
+        if not (self._slots.acquire(timeout=timeout) if timeout > 0 else self._slots.acquire(blocking=False)):
+            return None
+        while True:
+            try:
                 sock, last_used = self._pool.popleft()
-                # Check if connection is still valid and not idle too long
-                if time.time() - last_used < self.idle_timeout:
-                    try:
-                        # Quick check if socket is still valid
-                        sock.getpeername()
-                        return sock
-                    except (OSError, socket.error):
-                        # Connection is dead, discard it
-                        try:
-                            sock.close()
-                        except:
-                            pass
-                        continue
-                else:
-                    # Connection idle too long, close it
-                    try:
-                        sock.close()
-                    except:
-                        pass
-            
-            # Create new connection if under limit
-            if self._active_connections < self.max_connections:
-                sock = self._create_connection()
-                if sock:
-                    self._active_connections += 1
-                    return sock
+            except IndexError:
+                break
+            # Reap by age only: a dead peer surfaces on the next send/recv and the
+            # caller retries, while keepalive culls silent ones in the background
+            if time.time() - last_used < self.idle_timeout:
+                return sock
+            self._discard(sock)
         
-        return None
+        try:
+            return self._create_connection()
+        except BaseException:
+            self._slots.release()
+            raise
     
     def return_connection(self, sock: Optional[socket.socket]):
-        """Return a connection to the pool."""
-        if sock is None:
-            return
-        
-        with self._lock:
-            try:
-                # Check if socket is still valid
-                sock.getpeername()
-                self._pool.append((sock, time.time()))
-            except (OSError, socket.error):
-                # Connection is dead, close it
-                try:
-                    sock.close()
-                except:
-                    pass
-                self._active_connections -= 1
+        """Return a connection to the pool (``None`` for one the caller closed)."""
+        if sock is not None:
+            # Pooled before the permit is released, so a waiter finds it instead of dialing
+            self._pool.append((sock, time.time()))
+        self._slots.release()
     
     def close_all(self):
         """Close all connections in the pool."""
-        with self._lock:
-            while self._pool:
+        while True:
+            try:
                 sock, _ = self._pool.popleft()
-                try:
-                    sock.close()
-                except:
-                    pass
-            self._active_connections = 0
+            except IndexError:
+                break
+            self._discard(sock)
 
 
 class OrderBookClient:
@@ -109,11 +222,13 @@ class OrderBookClient:
     """
 
     def __init__(self, host: str, port: int, use_pooling: bool = True, 
-                 max_connections: int = 5, connection_timeout: float = 5.0,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS, connection_timeout: float = 5.0,
                  retry_attempts: int = 3, retry_delay: float = 0.1):
         self.host = host
         self.port = port
         self.use_pooling = use_pooling
+        self.max_connections = max_connections
+        self.connection_timeout = connection_timeout
         self.retry_attempts = retry_attempts
         self.retry_delay = retry_delay
         
@@ -121,8 +236,16 @@ class OrderBookClient:
             self.pool = ConnectionPool(host, port, max_connections, connection_timeout)
         else:
             self.pool = None
+        
+        # Asyncio streams are bound to the loop that opened them, so the async
+        # path keeps its own idle streams and is reset when the loop changes
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self._async_streams: deque = deque()
+        # Last raw SNAPSHOTS block per symbol with its parsed form: unchanged books skip re-parsing
+        self._snapshot_blocks: Dict[int, Tuple[str, Dict[str, Any]]] = {}
 
-    def _send_raw_command(self, command: str) -> str:
+    def _send_raw_command(self, command: Union[str, bytes]) -> str:
         """Send arbitrary command and return the raw string response.
         
         Uses connection pooling if enabled, otherwise creates a new connection per request.
@@ -132,190 +255,296 @@ class OrderBookClient:
         else:
             return self._send_without_pooling(command)
     
-    def _send_with_pooling(self, command: str) -> str:
-        """Send command using connection pool with retry logic."""
+    def _send_with_pooling(self, command: Union[str, bytes]) -> str:
+        """Send command using connection pool with retry logic.
+        
+        Only transport failures are retried, after a capped, jittered
+        exponential backoff; a full pool is waited on rather than polled.
+        """
         last_error = None
         
         for attempt in range(self.retry_attempts):
             sock = None
             try:
-                # Get connection from pool
-                sock = self.pool.get_connection()
+                # Get connection from pool, waiting for one to be returned if all are in use
+                sock = self.pool.get_connection(timeout=self.connection_timeout)
                 if sock is None:
-                    if attempt < self.retry_attempts - 1:
-                        time.sleep(self.retry_delay * (attempt + 1))  # Exponential backoff
-                        continue
                     return "ERROR Connection pool exhausted\n"
                 
                 # Send command
-                sock.sendall(command.encode() + b"\n")
+                sock.sendall(_wire(command))
                 
                 # Receive response
-                response = b""
                 sock.settimeout(5.0)  # Response timeout
-                while True:
-                    chunk = sock.recv(4096)
-                    if not chunk:
-                        break
-                    response += chunk
-                    if any(marker in response for marker in (b"END\n", b"OK", b"ERROR", b"NOTFOUND")):
-                        break
+                response = _recv_frame(sock)
                 
                 # Return connection to pool
                 self.pool.return_connection(sock)
                 return response.decode("utf-8", errors="ignore")
                 
-            except socket.timeout:
-                last_error = "Backend timeout"
-                if sock:
-                    try:
-                        sock.close()
-                    except:
-                        pass
-                    self.pool.return_connection(None)  # Mark connection as dead
+            except _RETRYABLE_ERRORS as e:
+                last_error = "Backend timeout" if isinstance(e, socket.timeout) else f"Connection error: {e}"
+                self._drop_connection(sock)
                 if attempt < self.retry_attempts - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                    continue
+                    time.sleep(self._backoff(attempt))
                     
-            except (ConnectionRefusedError, OSError) as e:
-                last_error = f"Connection error: {e}"
-                if sock:
-                    try:
-                        sock.close()
-                    except:
-                        pass
-                    self.pool.return_connection(None)  # Mark connection as dead
-                if attempt < self.retry_attempts - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                    continue
+            except OSError as e:
+                self._drop_connection(sock)
+                return f"ERROR Connection error: {e}\n"
                     
             except Exception as e:
-                last_error = f"Unexpected error: {e}"
-                if sock:
-                    try:
-                        sock.close()
-                    except:
-                        pass
-                    self.pool.return_connection(None)
-                if attempt < self.retry_attempts - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
-                    continue
+                self._drop_connection(sock)
+                return f"ERROR Unexpected error: {e}\n"
         
         return f"ERROR {last_error}\n"
     
-    def _send_without_pooling(self, command: str) -> str:
+    def _drop_connection(self, sock: Optional[socket.socket]):
+        """Close a borrowed socket after a failure and hand its permit back."""
+        if sock is None:
+            return  # never borrowed, or the pool already released the permit
+        try:
+            sock.close()
+        except OSError:
+            pass
+        self.pool.return_connection(None)
+    
+    def _backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry ``attempt + 1``: capped exponential with jitter."""
+        return min(RETRY_BACKOFF_CAP, self.retry_delay * (1 << attempt)) * random.uniform(0.5, 1.5)
+    
+    def _send_without_pooling(self, command: Union[str, bytes]) -> str:
         """Send command without pooling (legacy behavior)."""
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                _tune_socket(sock)
                 sock.settimeout(5.0)
                 sock.connect((self.host, self.port))
-                sock.sendall(command.encode() + b"\n")
-
-                response = b""
-                while True:
-                    chunk = sock.recv(4096)
-                    if not chunk:
-                        break
-                    response += chunk
-                    if any(marker in response for marker in (b"END\n", b"OK", b"ERROR", b"NOTFOUND")):
-                        break
-
-                return response.decode("utf-8", errors="ignore")
+                _negotiate_framing(sock)
+                sock.sendall(_wire(command))
+                return _recv_frame(sock).decode("utf-8", errors="ignore")
         except Exception as exc:
             return f"ERROR {exc}\n"
     
+    async def _send_raw_command_async(self, command: Union[str, bytes]) -> str:
+        """Send a command over asyncio streams without blocking the event loop.
+        
+        At most ``max_connections`` commands are in flight; idle streams are
+        reused when pooling is enabled.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_slots = asyncio.Semaphore(self.max_connections)
+            self._async_streams.clear()
+        
+        async with self._async_slots:
+            streams = self._async_streams.popleft() if self._async_streams else None
+            reused = streams is not None
+            try:
+                while True:
+                    try:
+                        if streams is None:
+                            streams = await self._open_streams_async()
+                        reader, writer = streams
+                        writer.write(_wire(command))
+                        await writer.drain()
+                        
+                        response = await asyncio.wait_for(_read_frame_async(reader), timeout=5.0)
+                        break
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        if not reused:
+                            raise
+                        # The backend dropped this idle stream (restart, keepalive); retry once on a fresh one
+                        reused = False
+                        _close_streams(streams)
+                        streams = None
+            except asyncio.IncompleteReadError:
+                _close_streams(streams)
+                return "ERROR Backend closed connection\n"
+            except (asyncio.TimeoutError, OSError) as exc:
+                _close_streams(streams)
+                return f"ERROR {str(exc) or 'Backend timeout'}\n"
+            except BaseException:
+                # Cancelled mid-request: a late reply would desync the stream, so never pool it
+                _close_streams(streams)
+                raise
+            
+            if self.use_pooling:
+                self._async_streams.append(streams)
+            else:
+                writer.close()
+            return response.decode("utf-8", errors="ignore")
+    
+    async def _open_streams_async(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Open a tuned asyncio connection and switch it to framed replies."""
+        streams = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.connection_timeout
+        )
+        try:
+            _tune_socket(streams[1].get_extra_info("socket"))
+            streams[1].write(FRAMED_COMMAND)
+            if await asyncio.wait_for(_read_frame_async(streams[0]), timeout=5.0) != FRAMED_ACK:
+                raise ConnectionError("Backend does not support framed replies")
+        except BaseException:
+            _close_streams(streams)
+            raise
+        return streams
+    
     def close(self):
         """Close all connections in the pool (if pooling is enabled)."""
         if self.pool:
             self.pool.close_all()
+        while self._async_streams:
+            _, writer = self._async_streams.popleft()
+            try:
+                writer.close()
+            except Exception:
+                pass
 
     def send_command(self, command: str) -> str:
         """Alias for clarity when called externally."""
         return self._send_raw_command(command)
 
+    async def send_command_async(self, command: str) -> str:
+        """Async counterpart of send_command for callers running on an event loop."""
+        return await self._send_raw_command_async(command)
+
+    async def send_command_batch_async(self, commands: Sequence[Union[str, bytes]]) -> List[str]:
+        """Send ADD/CANCEL commands as BATCH requests and return one response line per command.
+        
+        If a whole request fails, each of its commands gets that error as its response.
+        """
+        responses: List[str] = []
+        for start in range(0, len(commands), BATCH_MAX_COMMANDS):
+            chunk = commands[start:start + BATCH_MAX_COMMANDS]
+            command = b"BATCH %d\n" % len(chunk) + b"".join(map(_wire, chunk))
+            response = await self._send_raw_command_async(command)
+            lines = response.split("\n")
+            if "END_BATCH" not in lines:
+                error = response.strip() or "ERROR Empty batch response"
+                responses.extend(error for _ in chunk)
+                continue
+            lines = lines[:lines.index("END_BATCH")]
+            lines += ["ERROR Missing batch response"] * (len(chunk) - len(lines))
+            responses.extend(lines[:len(chunk)])
+        return responses
+
     def add_order(self, symbol_id: int, side: str, order_type: str, price: float, quantity: float) -> Dict[str, Any]:
         """Add order to orderbook."""
-        side_char = "B" if side.upper() == "BUY" else "S"
-        type_char = "L" if order_type.upper() == "LIMIT" else "M"
-        price_int = int(price) if order_type.upper() == "LIMIT" else 0
-        qty_int = int(quantity)
+        cmd = self._add_order_command(symbol_id, side, order_type, price, quantity)
+        return self._parse_add_order(self._send_raw_command(cmd))
+
+    async def add_order_async(
+        self, symbol_id: int, side: str, order_type: str, price: float, quantity: float
+    ) -> Dict[str, Any]:
+        """Add order to orderbook without blocking the event loop."""
+        cmd = self._add_order_command(symbol_id, side, order_type, price, quantity)
+        return self._parse_add_order(await self._send_raw_command_async(cmd))
+
+    def cancel_order(self, symbol_id: int, order_id: int) -> Dict[str, Any]:
+        return self._parse_cancel_order(self._send_raw_command(f"CANCEL {symbol_id} {order_id}"))
+
+    async def cancel_order_async(self, symbol_id: int, order_id: int) -> Dict[str, Any]:
+        """Cancel an order without blocking the event loop."""
+        return self._parse_cancel_order(
+            await self._send_raw_command_async(f"CANCEL {symbol_id} {order_id}")
+        )
+
+    async def add_orders_async(
+        self, symbol_id: int, orders: Sequence[Tuple[str, str, float, float]]
+    ) -> List[Dict[str, Any]]:
+        """Add several (side, order_type, price, quantity) orders in one backend round trip."""
+        commands = [self._add_order_command(symbol_id, *order) for order in orders]
+        return [self._parse_add_order(r) for r in await self.send_command_batch_async(commands)]
+
+    async def cancel_orders_async(self, symbol_id: int, order_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Cancel several orders in one backend round trip."""
+        commands = [f"CANCEL {symbol_id} {order_id}" for order_id in order_ids]
+        return [self._parse_cancel_order(r) for r in await self.send_command_batch_async(commands)]
 
-        cmd = f"ADD {symbol_id} {side_char} {type_char} {price_int} {qty_int}"
-        response = self._send_raw_command(cmd)
+    @staticmethod
+    def _add_order_command(symbol_id: int, side: str, order_type: str, price: float, quantity: float) -> bytes:
+        # Formatted straight to bytes: every order is a distinct command, so there is nothing to cache
+        limit = order_type.upper() == "LIMIT"
+        return b"ADD %d %s %s %d %d\n" % (
+            symbol_id,
+            b"B" if side.upper() == "BUY" else b"S",
+            b"L" if limit else b"M",
+            int(price) if limit else 0,
+            int(quantity),
+        )
 
+    @staticmethod
+    def _parse_add_order(response: str) -> Dict[str, Any]:
         if response.startswith("OK"):
             parts = response.strip().split()
             order_id = parts[1] if len(parts) > 1 else "0"
             return {"status": "success", "orderId": order_id}
         return {"status": "error", "message": response.strip()}
 
-    def cancel_order(self, symbol_id: int, order_id: int) -> Dict[str, Any]:
-        cmd = f"CANCEL {symbol_id} {order_id}"
-        response = self._send_raw_command(cmd)
+    @staticmethod
+    def _parse_cancel_order(response: str) -> Dict[str, Any]:
         if response.startswith("OK"):
             return {"status": "success"}
         return {"status": "error", "message": response.strip()}
 
     def get_snapshot(self, symbol_id: int) -> Dict[str, Any]:
         """Get depth snapshot for an instrument."""
-        cmd = f"SNAPSHOT {symbol_id}"
-        response = self._send_raw_command(cmd)
+        return self._parse_snapshot(symbol_id, self._send_raw_command(f"SNAPSHOT {symbol_id}"))
+
+    async def get_snapshot_async(self, symbol_id: int) -> Dict[str, Any]:
+        """Get depth snapshot for an instrument without blocking the event loop."""
+        return self._parse_snapshot(symbol_id, await self._send_raw_command_async(f"SNAPSHOT {symbol_id}"))
+
+    async def get_snapshots_async(self, symbol_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Get depth snapshots for several instruments in a single backend round trip.
+        
+        Symbols the backend does not know are missing from the result. A book
+        that has not changed since the previous call comes back as the same
+        dict, so treat results as read-only.
+        """
+        command = "SNAPSHOTS " + " ".join(map(str, symbol_ids))
+        response = await self._send_raw_command_async(command)
+        snapshots = {}
+        for block in response.split("END\n"):
+            block = block.strip()
+            if not block.startswith("SNAPSHOT "):
+                continue
+            try:
+                symbol_id = int(block.split(None, 2)[1])
+            except (IndexError, ValueError):
+                continue
+            cached = self._snapshot_blocks.get(symbol_id)
+            if cached is not None and cached[0] == block:
+                snapshots[symbol_id] = cached[1]
+                continue
+            snapshot = self._parse_snapshot(symbol_id, block)
+            if snapshot["status"] == "success":
+                self._snapshot_blocks[symbol_id] = (block, snapshot)
+            snapshots[symbol_id] = snapshot
+        return snapshots
 
+    def forget_snapshots(self, symbol_ids: Iterable[int]):
+        """Drop cached SNAPSHOTS blocks, e.g. for removed instruments."""
+        for symbol_id in symbol_ids:
+            self._snapshot_blocks.pop(symbol_id, None)
+
+    @staticmethod
+    def _parse_snapshot(symbol_id: int, response: str) -> Dict[str, Any]:
+        """Parse a SNAPSHOT response into bids/asks."""
         try:
             lines = response.strip().split("\n")
             if not lines or not lines[0].startswith("SNAPSHOT"):
                 return {"status": "error", "message": "Invalid response"}
 
-            bids, asks = [], []
-            idx = 1
-
-            if idx < len(lines) and lines[idx].startswith("BIDS"):
-                try:
-                    bid_count = int(lines[idx].split()[1])
-                except (IndexError, ValueError):
-                    return {"status": "error", "message": "Invalid BIDS header format"}
-                idx += 1
-                for _ in range(bid_count):
-                    if idx >= len(lines):
-                        break  # Prevent index out of bounds
-                    parts = lines[idx].split()
-                    if len(parts) >= 3:
-                        try:
-                            bids.append(
-                                {
-                                    "price": float(parts[0]),
-                                    "quantity": float(parts[1]),
-                                    "orders": int(parts[2]),
-                                }
-                            )
-                        except (ValueError, IndexError):
-                            # Skip malformed line
-                            pass
-                    idx += 1
-
-            if idx < len(lines) and lines[idx].startswith("ASKS"):
-                try:
-                    ask_count = int(lines[idx].split()[1])
-                except (IndexError, ValueError):
-                    return {"status": "error", "message": "Invalid ASKS header format"}
-                idx += 1
-                for _ in range(ask_count):
-                    if idx >= len(lines):
-                        break  # Prevent index out of bounds
-                    parts = lines[idx].split()
-                    if len(parts) >= 3:
-                        try:
-                            asks.append(
-                                {
-                                    "price": float(parts[0]),
-                                    "quantity": float(parts[1]),
-                                    "orders": int(parts[2]),
-                                }
-                            )
-                        except (ValueError, IndexError):
-                            # Skip malformed line
-                            pass
-                    idx += 1
+            try:
+                bids, idx = _parse_levels(lines, 1, "BIDS")
+            except (IndexError, ValueError):
+                return {"status": "error", "message": "Invalid BIDS header format"}
+            try:
+                asks, idx = _parse_levels(lines, idx, "ASKS")
+            except (IndexError, ValueError):
+                return {"status": "error", "message": "Invalid ASKS header format"}
 
             return {"status": "success", "symbol_id": symbol_id, "bids": bids, "asks": asks}
         except Exception as exc:
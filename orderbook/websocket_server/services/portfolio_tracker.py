@@ -1,11 +1,16 @@
 """Service for tracking agent portfolios and P&L."""
 
-from typing import Dict, List, Optional
-from datetime import datetime
+import time
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Set
 
 from models.agent import Agent, Position
 from models.trade import Trade
 
+# side -> (canonical side, cash sign, position sign): buying spends cash for units,
+# selling the reverse. Trades store the canonical string so every record shares it.
+_SIDE_SIGN = {"buy": ("buy", -1, 1), "sell": ("sell", 1, -1)}
+
 
 class PortfolioTracker:
     """Tracks agent portfolios, calculates P&L, and maintains trade history."""
@@ -14,6 +19,11 @@ class PortfolioTracker:
         self.agent_manager = agent_manager
         self.trades: Dict[str, List[Trade]] = {}  # agent_id -> list of trades
         self.next_trade_id = 1
+        # Latest mark price per instrument; updates only carry the symbols that moved
+        self.last_prices: Dict[int, float] = {}
+        # instrument_id -> agent_ids holding a position in it, so a price move
+        # only revalues the agents it can affect
+        self._holders: Dict[int, Set[str]] = {}
     
     def record_trade(self, agent_id: str, instrument_id: int, side: str, 
                     price: float, quantity: int) -> Trade:
@@ -21,6 +31,10 @@ class PortfolioTracker:
         agent = self.agent_manager.get_agent(agent_id)
         if not agent:
             raise ValueError(f"Agent {agent_id} not found")
+        signs = _SIDE_SIGN.get(side)
+        if signs is None:
+            raise ValueError(f"Invalid side {side!r}")
+        side, cash_sign, quantity_sign = signs
         
         # Create trade record
         trade = Trade(
@@ -30,7 +44,7 @@ class PortfolioTracker:
             side=side,
             price=price,
             quantity=quantity,
-            timestamp=datetime.now()
+            timestamp_ns=time.time_ns()
         )
         self.next_trade_id += 1
         
@@ -40,17 +54,16 @@ class PortfolioTracker:
         self.trades[agent_id].append(trade)
         
         # Update agent portfolio
-        if side == "buy":
-            # Buying: reduce cash, increase position
-            cost = price * quantity
-            agent.cash -= cost
-            agent.update_position(instrument_id, quantity, price)
-        else:  # sell
-            # Selling: increase cash, decrease position
-            revenue = price * quantity
-            agent.cash += revenue
-            agent.update_position(instrument_id, -quantity, price)
+        agent.cash += cash_sign * (price * quantity)
+        agent.update_position(instrument_id, quantity_sign * quantity, price)
+        
+        if instrument_id in agent.positions:
+            self._holders.setdefault(instrument_id, set()).add(agent_id)
+        else:
+            self._holders.get(instrument_id, set()).discard(agent_id)
         
+        # Prices may not move again for a while; revalue this agent now
+        self._revalue(agent)
         return trade
     
     def calculate_portfolio_value(self, agent_id: str, 
@@ -59,23 +72,42 @@ class PortfolioTracker:
         agent = self.agent_manager.get_agent(agent_id)
         if not agent:
             return 0.0
-        
+        return self._portfolio_value(agent, current_prices)
+    
+    @staticmethod
+    def _portfolio_value(agent: Agent, current_prices: Dict[int, float]) -> float:
+        """Cash plus positions marked at ``current_prices`` (average cost when unpriced)."""
         total = agent.cash
-        
+        get_price = current_prices.get
         for instrument_id, position in agent.positions.items():
-            current_price = current_prices.get(instrument_id, position.avg_price)
-            total += position.quantity * current_price
-        
+            total += position.quantity * get_price(instrument_id, position.avg_price)
         return total
     
     def update_portfolio_values(self, current_prices: Dict[int, float]):
-        """Update all agent portfolio values and P&L."""
-        for agent_id in self.agent_manager.get_all_agent_ids():
+        """Update all agent portfolio values and P&L.
+        
+        ``current_prices`` may hold only the instruments whose price changed;
+        the rest are valued at their last known price. Only agents holding an
+        instrument whose price actually moved are revalued; trades revalue
+        their agent in ``record_trade``.
+        """
+        last_prices = self.last_prices
+        affected: Set[str] = set()
+        for instrument_id, price in current_prices.items():
+            if last_prices.get(instrument_id) != price:
+                last_prices[instrument_id] = price
+                holders = self._holders.get(instrument_id)
+                if holders:
+                    affected |= holders
+        for agent_id in affected:
             agent = self.agent_manager.get_agent(agent_id)
-            if agent:
-                total_value = self.calculate_portfolio_value(agent_id, current_prices)
-                agent.total_value = total_value
-                agent.pnl = total_value - agent.starting_capital
+            if agent is not None:
+                self._revalue(agent)
+    
+    def _revalue(self, agent: Agent):
+        total_value = self._portfolio_value(agent, self.last_prices)
+        agent.total_value = total_value
+        agent.pnl = total_value - agent.starting_capital
     
     def get_trades(self, agent_id: str, limit: Optional[int] = None) -> List[Trade]:
         """Get trade history for an agent."""
@@ -84,7 +116,7 @@ class PortfolioTracker:
             return trades[-limit:]
         return trades
     
-    def get_all_trades(self) -> Dict[str, List[Trade]]:
-        """Get all trades for all agents."""
-        return self.trades.copy()
+    def get_all_trades(self) -> Mapping[str, List[Trade]]:
+        """Get all trades for all agents, as a read-only live view (no per-call copy)."""
+        return MappingProxyType(self.trades)
 
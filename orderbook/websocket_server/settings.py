@@ -1,6 +1,7 @@
 """Application settings and environment configuration."""
 
 from dataclasses import dataclass, field
+import functools
 import os
 
 
@@ -16,7 +17,7 @@ def _get_env_int(name: str, default: int) -> int:
     return int(os.getenv(name, default))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class InstrumentDefaults:
     ticker: str = field(default_factory=lambda: _get_env("DEFAULT_INSTRUMENT_TICKER", "AAPL"))
     description: str = field(default_factory=lambda: _get_env("DEFAULT_INSTRUMENT_DESC", "Apple Inc."))
@@ -24,7 +25,7 @@ class InstrumentDefaults:
     initial_price: float = field(default_factory=lambda: _get_env_float("DEFAULT_INSTRUMENT_PRICE", 150.0))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Settings:
     cpp_host: str = field(default_factory=lambda: _get_env("CPP_HOST", "localhost"))
     cpp_port: int = field(default_factory=lambda: _get_env_int("CPP_PORT", 9999))
@@ -34,5 +35,11 @@ class Settings:
     default_instrument: InstrumentDefaults = field(default_factory=InstrumentDefaults)
 
 
-settings = Settings()
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings read from the environment once; the instance is immutable and shared."""
+    return Settings()
+
+
+settings = get_settings()
 
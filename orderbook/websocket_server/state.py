@@ -4,7 +4,7 @@ from typing import Set
 
 from fastapi import WebSocket
 
-import settings
+from settings import get_settings
 from services import (
     InstrumentService,
     AgentManager,
@@ -14,8 +14,10 @@ from services import (
     OrderBookClient,
 )
 
+settings = get_settings()
+
 # Core service instances
-ob_client = OrderBookClient(settings.settings.cpp_host, settings.settings.cpp_port)
+ob_client = OrderBookClient(settings.cpp_host, settings.cpp_port)
 instrument_service = InstrumentService(ob_client)
 agent_manager = AgentManager()
 portfolio_tracker = PortfolioTracker(agent_manager)
@@ -24,7 +26,9 @@ market_maker_service = MarketMakerService(ob_client)
 
 # Active dashboard websocket connections
 regular_connections: Set[WebSocket] = set()
+# Agent websockets that negotiated the msgpack subprotocol for broadcasts
+msgpack_connections: Set[WebSocket] = set()
 
 # Default instrument bootstrap configuration
-DEFAULT_INSTRUMENT = settings.settings.default_instrument
+DEFAULT_INSTRUMENT = settings.default_instrument
 